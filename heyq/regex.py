@@ -0,0 +1,28 @@
+from __future__ import annotations
+import importlib
+import os
+import re
+from types import ModuleType
+from typing import Optional, cast
+
+# google-re2: linear-time matching, no backtracking blow-ups on odd input. It ships
+# no type stubs, so it is imported as a plain module to keep mypy --strict clean.
+re2: Optional[ModuleType]
+try:
+    re2 = importlib.import_module("re2")
+except ImportError:
+    re2 = None
+
+# RE2's per-call overhead loses to re on short voice commands, so it is opt-in for
+# callers that parse untrusted input and want the linear-time guarantee
+USE_RE2 = re2 is not None and os.environ.get("HEYQ_USE_RE2") == "1"
+
+
+def compile_pattern(pattern: str) -> re.Pattern[str]:
+    """RE2 pattern when HEYQ_USE_RE2=1 and RE2 accepts it, stdlib re otherwise"""
+    if USE_RE2 and re2 is not None:
+        try:
+            return cast("re.Pattern[str]", re2.compile(pattern))
+        except re2.error:
+            pass
+    return re.compile(pattern)
@@ -6,61 +6,424 @@ Hybrid AI+MCP Voice Automation System
 """
 
 import asyncio
+import functools
+import hashlib
+import time
 import uvicorn
-import json
+import orjson
 import re
-from fastapi import FastAPI, HTTPException
+from types import MappingProxyType
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from loguru import logger
-from typing import Optional, Dict, Any
+from cachetools import TTLCache
+from typing import Optional, Dict, Any, Tuple
 
 # Import our existing MCP client for AI strategies
 import sys
 import os
+from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'mcp_integration'))
 from real_mcp_client import RealMCPClient
 
 # Direct Playwright import for visible browser control
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 
-app = FastAPI(title="HeyQ Hybrid AI+MCP+Playwright Voice Automation")
+app = FastAPI(
+    title="HeyQ Hybrid AI+MCP+Playwright Voice Automation",
+    default_response_class=ORJSONResponse  # C-level encoding for the nested /api/run payload
+)
 
 # Serve static files (existing voice interface)
-app.mount("/static", StaticFiles(directory="heyq/webapp/static"), name="static")
+STATIC_DIR = Path(__file__).parent / "heyq" / "webapp" / "static"
+app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+
+# Landing page is static; read it once instead of on every GET /
+_INDEX_HTML = (STATIC_DIR / "index.html").read_bytes()
+
+# One bit per intent keyword. A command that mentions none of them
+# (plain "open X", "go to X", ...) is a simple navigation.
+_KW_BIT = {
+    "search": 1 << 0, "find": 1 << 1, "look": 1 << 2,
+    "login": 1 << 3, "sign in": 1 << 4, "log in": 1 << 5,
+    "buy": 1 << 6, "purchase": 1 << 7, "add to cart": 1 << 8,
+}
+_SEARCH_MASK = _KW_BIT["search"] | _KW_BIT["find"] | _KW_BIT["look"]
+_LOGIN_MASK = _KW_BIT["login"] | _KW_BIT["sign in"] | _KW_BIT["log in"]
+_BUY_MASK = _KW_BIT["buy"] | _KW_BIT["purchase"] | _KW_BIT["add to cart"]
+
+# A plain keyword alternation: no backtracking risk, and stdlib re beats RE2's
+# per-call overhead on commands this short
+_KEYWORD_RE = re.compile(r'\b(?:' + '|'.join(_KW_BIT) + r')\b')
+
+def _intent_mask(cmd: str) -> int:
+    """OR together the bits of every intent keyword in a lowercased command"""
+    mask = 0
+    for match in _KEYWORD_RE.finditer(cmd):
+        mask |= _KW_BIT[match.group()]
+    return mask
+
+# Search-term extraction ("search for X", "search me X", "go to Y and search X", "search X")
+_SEARCH_QUERY_RE = re.compile(r'search for (.+)|find (.+)|look for (.+)')
+_SEARCH_ME_RE = re.compile(r'search me (.+)')
+_NAV_AND_SEARCH_RE = re.compile(r'(?:go to|open|visit)\s+[^\s]+(?:\.[a-z]{2,})?\s+and\s+search(?:\s+me)?\s+(.+)')
+_SEARCH_REST_RE = re.compile(r'search\s+(.+)')
+
+# Search-term cleanup for travel/booking phrasing
+_DOMAIN_SUFFIX_RE = re.compile(r'\s+(on|in|at)\s+\w+\.\w+.*$', re.IGNORECASE)
+
+# Fallback cleanup: drop the navigation part and the search verb itself
+_NAV_PREFIX_RE = re.compile(r'(go to|open|visit|navigate to)\s+[^\s]+(?:\.[a-z]{2,})?\s*(and\s*)?', re.IGNORECASE)
+_SEARCH_VERB_RE = re.compile(r'\b(search|find|look)(?:\s+me)?\s*', re.IGNORECASE)
+
+_PRODUCT_RE = re.compile(r'buy (.+)|purchase (.+)|add (.+) to cart')
+
+# Read-only strategy templates per intent kind; callers build a fresh dict
+# with the target/description filled in, so the shared templates never change
+_STRATEGIES = {
+    "nav": MappingProxyType({
+        "action": "simple_navigation",
+        "strategy": "open_verify_close",
+        "flow_type": "simple",
+        "viewing_time": 5,  # Shorter viewing time
+        "auto_close": True,
+    }),
+    "search": MappingProxyType({
+        "action": "search",
+        "strategy": "locate_search_box_and_search",
+        "flow_type": "complex",
+        "viewing_time": 8,  # Reduced time for auto-close
+        "auto_close": True,  # Enable auto-close for search operations
+    }),
+    "login": MappingProxyType({
+        "action": "login",
+        "strategy": "locate_login_elements",
+        "flow_type": "complex",
+        "viewing_time": 20,
+        "auto_close": False,
+        "description": "Login flow automation",
+    }),
+    "buy": MappingProxyType({
+        "action": "purchase",
+        "strategy": "search_and_add_to_cart",
+        "flow_type": "complex",
+        "viewing_time": 25,
+        "auto_close": False,
+    }),
+}
+
+# Resource types a navigation check never needs; blocked for simple flows.
+# Stylesheets still load so the proof screenshot shows the real page layout.
+_HEAVY_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+async def _abort_heavy_resources(route):
+    """Playwright route handler that drops images, media and fonts"""
+    if route.request.resource_type in _HEAVY_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+def _normalize_command(voice_command: str) -> str:
+    """Lowercase and collapse whitespace so equivalent utterances share cache entries"""
+    return " ".join(voice_command.lower().split())
+
+def _simple_navigation_strategy(cmd: str, target_url: str) -> MappingProxyType:
+    return MappingProxyType({**_STRATEGIES["nav"], "description": f"Simple navigation to {target_url}"})
+
+def _search_strategy(cmd: str, target_url: str) -> MappingProxyType:
+    # Enhanced search term extraction for ANY type of search (flights, hotels, etc.)
+    search_term = None
+    
+    # Pattern 1: "search for X", "find X", "look for X"
+    query = _SEARCH_QUERY_RE.search(cmd)
+    if query:
+        search_term = query.group(1) or query.group(2) or query.group(3)
+    
+    # Pattern 2: "search me X" - common for travel/booking sites
+    if not search_term:
+        pattern = _SEARCH_ME_RE.search(cmd)
+        if pattern:
+            search_term = pattern.group(1).strip()
+    
+    # Pattern 3: "go to X and search Y" or "open X and search Y"  
+    if not search_term:
+        pattern = _NAV_AND_SEARCH_RE.search(cmd)
+        if pattern:
+            search_term = pattern.group(1).strip()
+        else:
+            # Handle simple "search X" pattern
+            pattern = _SEARCH_REST_RE.search(cmd)
+            if pattern:
+                search_term = pattern.group(1).strip()
+    
+    # Pattern 4: Extract everything after "find" or "look"
+    if not search_term:
+        if 'find ' in cmd:
+            search_term = cmd.split('find ', 1)[1].strip()
+        elif 'look ' in cmd:
+            search_term = cmd.split('look ', 1)[1].strip()
+    
+    # INTELLIGENT CLEANUP for travel/flight searches
+    if search_term:
+        original_term = search_term
+        
+        # Remove domain references that got mixed in
+        search_term = _DOMAIN_SUFFIX_RE.sub('', search_term).strip()
+        
+        # Commands are lowercased and single-spaced by _normalize_command, so the
+        # booking boilerplate is a fixed prefix and needs no regex engine.
+        # Handle flight-specific patterns: "ticket for Delhi to Bangalore flight"
+        # Clean up to: "Delhi to Bangalore flight"
+        search_term = search_term.removeprefix('ticket for ')
+        
+        # Handle hotel/accommodation patterns
+        search_term = search_term.removeprefix('hotel in ')
+        
+        if original_term != search_term:
+            logger.info(f"🧹 CLEANED SEARCH TERM: '{original_term}' -> '{search_term}'")
+    
+    # Enhanced fallback for travel/booking scenarios
+    if not search_term or len(search_term.strip()) == 0:
+        # Try to extract meaningful travel-related content
+        cleaned_cmd = _NAV_PREFIX_RE.sub('', cmd)
+        cleaned_cmd = _SEARCH_VERB_RE.sub('', cleaned_cmd).strip()
+        
+        # Look for travel patterns
+        if any(word in cleaned_cmd for word in ['delhi', 'bangalore', 'mumbai', 'flight', 'ticket', 'hotel', 'to']):
+            search_term = cleaned_cmd
+        else:
+            search_term = cleaned_cmd if cleaned_cmd else "trending"
+    
+    logger.info(f"🔍 FINAL SEARCH TERM: '{search_term}' from command: '{cmd}'")
+    
+    return MappingProxyType({**_STRATEGIES["search"], "target": search_term, "description": f"Search for '{search_term}'"})
+
+def _login_strategy(cmd: str, target_url: str) -> MappingProxyType:
+    return _STRATEGIES["login"]
+
+def _purchase_strategy(cmd: str, target_url: str) -> MappingProxyType:
+    product = _PRODUCT_RE.search(cmd)
+    product_name = product.group(1) or product.group(2) or product.group(3) if product else "item"
+    return MappingProxyType({**_STRATEGIES["buy"], "target": product_name, "description": f"Purchase flow for '{product_name}'"})
+
+# Complex automation flows in priority order; the first mask a command hits wins
+_INTENT_TABLE = (
+    (_SEARCH_MASK, _search_strategy),
+    (_LOGIN_MASK, _login_strategy),
+    (_BUY_MASK, _purchase_strategy),
+)
+
+@functools.lru_cache(maxsize=1024)
+def _analyze_command(cmd: str, target_url: str) -> MappingProxyType:
+    """Strategy for a normalized command; pure, so results are cached read-only"""
+    # One pass over the command collects every intent keyword it mentions
+    mask = _intent_mask(cmd)
+    
+    # Plain "open X" commands return before any search-term extraction runs
+    if not mask:
+        return _simple_navigation_strategy(cmd, target_url)
+    
+    for intent_mask, handler in _INTENT_TABLE:
+        if mask & intent_mask:
+            return handler(cmd, target_url)
+    
+    return _simple_navigation_strategy(cmd, target_url)
+
+# Upper bound on the per-action delay a request may ask for, and the pace /api/demo runs at
+_MAX_SLOW_MO_MS = 2000
+_DEMO_SLOW_MO_MS = 1000
 
 class VoiceRequest(BaseModel):
     utterance: str
     headed: bool = True
     use_ai: bool = True
+    demo_mode: bool = False  # Keep the browser open for the strategy's viewing time
+    slow_mo_ms: int = 0  # Delay between Playwright actions, capped at _MAX_SLOW_MO_MS
+    stream: bool = False  # Send step results as Server-Sent Events while the run progresses
 
-class HybridAutomationEngine:
-    """Combines MCP AI strategies with direct Playwright browser control"""
+# Common element selectors (most websites use these patterns), each joined into
+# one CSS union so a single wait resolves on whichever candidate shows up first.
+# Callers filter the union to visible matches before taking .first: a hidden
+# earlier match (e.g. a mobile-only search input) would otherwise be waited on.
+_SEARCH_BOX_SELECTOR = ', '.join([
+    'input[name="q"]',           # Google, YouTube
+    'input[name="search"]',      # Generic
+    'input[placeholder*="search" i]',  # By placeholder
+    'input[type="search"]',      # HTML5 search
+    '#search', '.search-input', '[data-testid="search"]'
+])
+_LOGIN_SELECTOR = ', '.join([
+    'a[href*="login"]', 'a[href*="signin"]',
+    'button:has-text("Login")', 'button:has-text("Sign In")',
+    '[data-testid="login"]', '.login-btn'
+])
+_PURCHASE_BUTTON_SELECTOR = ', '.join([
+    'button:has-text("Add to Cart")',
+    'button:has-text("Buy Now")',
+    '[data-testid="add-to-cart"]',
+    '.add-to-cart-btn'
+])
+
+# Shared Playwright driver: its Node process is started once for the app, not per browser
+_PW = None
+_pw_lock = asyncio.Lock()
+
+async def get_playwright():
+    """Return the shared Playwright driver, starting it on first use"""
+    global _PW
+    async with _pw_lock:
+        if _PW is None:
+            _PW = await async_playwright().start()
+        return _PW
+
+# Launch-time slow_mo values the pool keeps browsers for; requests snap to the nearest
+_SLOW_MO_STEPS_MS = (0, 250, 500, 1000, _MAX_SLOW_MO_MS)
+
+def _snap_slow_mo(slow_mo: int) -> int:
+    """Nearest pooled slow_mo step, so arbitrary values don't each get their own browsers"""
+    return min(_SLOW_MO_STEPS_MS, key=lambda step: abs(step - slow_mo))
+
+class BrowserPool:
+    """Keeps warm browsers across requests; each request gets its own context
     
-    def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
-        self.mcp_client = None
+    Browsers are pooled per (headless, slow_mo) pair since both are fixed at launch,
+    with slow_mo snapped to _SLOW_MO_STEPS_MS. Up to ``size`` idle browsers are kept
+    for each pair and at most ``max_idle`` across all of them.
+    """
     
-    async def start_visible_browser(self):
-        """Start a visible browser that user can see"""
-        logger.info("🚀 Starting visible browser for user...")
-        
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=False,           # Always visible
-            slow_mo=1000,            # Slow down for visibility
+    def __init__(self, size: int = 1, max_idle: int = 4):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[bool, int], list] = {}
+        self._closed = False  # Set by drain(); browsers released after that are closed
+    
+    def _idle_count(self) -> int:
+        return sum(len(browsers) for browsers in self._idle.values())
+    
+    async def _launch(self, headless: bool = False, slow_mo: int = 0):
+        playwright = await get_playwright()
+        return await playwright.chromium.launch(
+            headless=headless,
+            slow_mo=slow_mo,
             args=[
                 '--start-maximized',  # Full screen
                 '--disable-web-security'
             ]
         )
+    
+    async def warm_up(self, count: Optional[int] = None, headless: bool = False, slow_mo: int = 0):
+        """Launch browsers ahead of the first request"""
+        self._closed = False
+        count = self.size if count is None else count
+        slow_mo = _snap_slow_mo(slow_mo)
+        idle = self._idle.setdefault((headless, slow_mo), [])
+        count = min(count - len(idle), self.max_idle - self._idle_count())
+        browsers = await asyncio.gather(*(self._launch(headless, slow_mo) for _ in range(count)))
+        idle.extend(browsers)
+        logger.info(f"🔥 Browser pool warmed up with {len(idle)} browser(s)")
+    
+    async def acquire(self, headless: bool = False, slow_mo: int = 0):
+        """Return a fresh context on a warm browser and a coroutine function that releases it"""
+        key = (headless, _snap_slow_mo(slow_mo))
+        idle = self._idle.setdefault(key, [])
+        browser = None
+        while idle and browser is None:
+            candidate = idle.pop()
+            if candidate.is_connected():
+                browser = candidate
+        if browser is None:
+            browser = await self._launch(*key)
         
-        self.context = await self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080}
-        )
+        try:
+            context = await browser.new_context(
+                viewport={'width': 1920, 'height': 1080}
+            )
+        except Exception:
+            # Neither handed out nor back in the pool: don't leave the process behind
+            await browser.close()
+            raise
+        
+        async def release():
+            try:
+                await context.close()
+            finally:
+                # Looked up now, not at acquire: drain() may have swapped the pool out since
+                idle = self._idle.setdefault(key, [])
+                if (browser.is_connected() and not self._closed
+                        and len(idle) < self.size and self._idle_count() < self.max_idle):
+                    idle.append(browser)
+                elif browser.is_connected():
+                    await browser.close()
+        
+        return context, release
+    
+    async def drain(self):
+        """Close pooled browsers; the shared driver is stopped separately"""
+        self._closed = True
+        idle, self._idle = self._idle, {}
+        for browsers in idle.values():
+            for browser in browsers:
+                await browser.close()
+
+browser_pool = BrowserPool(
+    size=int(os.getenv("HEYQ_BROWSER_POOL_SIZE", "1")),
+    max_idle=int(os.getenv("HEYQ_BROWSER_POOL_MAX_IDLE", "4")),
+)
+
+# Shared MCP client: the Node server is spawned once for the app, not per request
+_mcp_client: Optional[RealMCPClient] = None
+_mcp_lock = asyncio.Lock()
+_mcp_hits = 0
+_mcp_misses = 0
+# After a failed start, requests skip MCP (and its node spawn + startup wait) for this long
+_MCP_RETRY_BACKOFF_S = 60.0
+_mcp_retry_at = 0.0
+
+async def get_mcp_client() -> Optional[RealMCPClient]:
+    """Return the running shared MCP client, (re)starting the server if needed"""
+    global _mcp_client, _mcp_hits, _mcp_misses, _mcp_retry_at
+    async with _mcp_lock:
+        if _mcp_client is not None and _mcp_client.is_running():
+            _mcp_hits += 1
+            return _mcp_client
+        if time.monotonic() < _mcp_retry_at:
+            return None  # Failed recently; callers fall back to the Playwright-only path
+        
+        _mcp_misses += 1
+        if _mcp_client is not None:
+            await _mcp_client.close()  # Its reader is gone; don't leave the server behind
+        client = RealMCPClient()
+        if await client.start_mcp_server():
+            _mcp_client = client
+        else:
+            await client.close()
+            _mcp_client = None
+            _mcp_retry_at = time.monotonic() + _MCP_RETRY_BACKOFF_S
+            logger.warning(f"MCP server failed to start; retrying in {_MCP_RETRY_BACKOFF_S:.0f}s at the earliest")
+        return _mcp_client
+
+def get_mcp_client_stats() -> Dict[str, int]:
+    """Hit/miss counters for reuse of the shared MCP client"""
+    return {"hits": _mcp_hits, "misses": _mcp_misses}
+
+class HybridAutomationEngine:
+    """Combines MCP AI strategies with direct Playwright browser control"""
+    
+    def __init__(self, headed: bool = True, slow_mo: int = 0):
+        self.headed = headed
+        self.slow_mo = slow_mo
+        self.context = None
+        self.page = None
+        self._release_context = None
+        self._last_strategy = None  # Strategy of the most recent run, for debugging
+    
+    async def start_visible_browser(self):
+        """Open a page on a warm browser from the pool"""
+        logger.info(f"🚀 Starting browser for user (headed={self.headed}, slow_mo={self.slow_mo}ms)...")
+        
+        self.context, self._release_context = await browser_pool.acquire(headless=not self.headed, slow_mo=self.slow_mo)
         self.page = await self.context.new_page()
         
         logger.info("✅ Visible browser ready for automation")
@@ -69,9 +432,7 @@ class HybridAutomationEngine:
     async def get_mcp_strategy(self, voice_command: str, target_url: str):
         """Use MCP to get intelligent automation strategy"""
         try:
-            if not self.mcp_client:
-                self.mcp_client = RealMCPClient()
-                await self.mcp_client.start_mcp_server()
+            await get_mcp_client()
             
             # Ask MCP for automation strategy (without actually executing)
             strategy_request = {
@@ -91,210 +452,85 @@ class HybridAutomationEngine:
     
     def analyze_voice_command(self, voice_command: str, target_url: str):
         """Intelligent voice command analysis with flow control"""
-        cmd = voice_command.lower()
+        cmd = _normalize_command(voice_command)
         
         logger.info(f"🧠 ANALYZING VOICE COMMAND: '{voice_command}' -> normalized: '{cmd}'")
         
-        # Determine if this is a simple navigation or complex automation
-        simple_navigation_indicators = [
-            "hey ", "open ", "visit ", "go to ", "navigate to "
-        ]
-        
-        complex_automation_indicators = [
-            "search", "find", "look for", "login", "sign in", "log in", 
-            "buy", "purchase", "add to cart", "checkout", "click", 
-            "fill", "type", "enter", "submit"
-        ]
-        
-        # Check if it's a simple navigation command
-        is_simple_navigation = False
-        for indicator in simple_navigation_indicators:
-            if cmd.startswith(indicator.strip()) or indicator.strip() in cmd:
-                # Check if there's no complex action after the navigation
-                remaining_cmd = cmd.replace(indicator.strip(), "").strip()
-                has_complex_action = any(action in remaining_cmd for action in complex_automation_indicators)
-                if not has_complex_action:
-                    is_simple_navigation = True
-                    break
-        
-        if is_simple_navigation:
-            return {
-                "action": "simple_navigation",
-                "strategy": "open_verify_close",
-                "flow_type": "simple",
-                "viewing_time": 5,  # Shorter viewing time
-                "auto_close": True,
-                "description": f"Simple navigation to {target_url}"
-            }
-        
-        # Complex automation flows
-        if any(word in cmd for word in ["search", "find", "look"]):
-            # Enhanced search term extraction for ANY type of search (flights, hotels, etc.)
-            search_term = None
-            
-            # Pattern 1: "search for X", "find X", "look for X"
-            query = re.search(r'search for (.+)|find (.+)|look for (.+)', cmd)
-            if query:
-                search_term = query.group(1) or query.group(2) or query.group(3)
-            
-            # Pattern 2: "search me X" - common for travel/booking sites
-            if not search_term:
-                pattern = re.search(r'search me (.+)', cmd)
-                if pattern:
-                    search_term = pattern.group(1).strip()
-            
-            # Pattern 3: "go to X and search Y" or "open X and search Y"  
-            if not search_term:
-                pattern = re.search(r'(?:go to|open|visit)\s+[^\s]+(?:\.[a-z]{2,})?\s+and\s+search(?:\s+me)?\s+(.+)', cmd)
-                if pattern:
-                    search_term = pattern.group(1).strip()
-                else:
-                    # Handle simple "search X" pattern
-                    pattern = re.search(r'search\s+(.+)', cmd)
-                    if pattern:
-                        search_term = pattern.group(1).strip()
-            
-            # Pattern 4: Extract everything after "find" or "look"
-            if not search_term:
-                if 'find ' in cmd:
-                    search_term = cmd.split('find ', 1)[1].strip()
-                elif 'look ' in cmd:
-                    search_term = cmd.split('look ', 1)[1].strip()
-            
-            # INTELLIGENT CLEANUP for travel/flight searches
-            if search_term:
-                original_term = search_term
-                
-                # Remove domain references that got mixed in
-                search_term = re.sub(r'\s+(on|in|at)\s+\w+\.\w+.*$', '', search_term, flags=re.IGNORECASE)
-                
-                # Handle flight-specific patterns: "ticket for Delhi to Bangalore flight"
-                # Clean up to: "Delhi to Bangalore flight"
-                search_term = re.sub(r'^\s*ticket\s+for\s+', '', search_term, flags=re.IGNORECASE)
-                search_term = re.sub(r'\s+flight\s*$', ' flight', search_term, flags=re.IGNORECASE)
-                
-                # Handle hotel/accommodation patterns
-                search_term = re.sub(r'^\s*hotel\s+in\s+', '', search_term, flags=re.IGNORECASE)
-                
-                search_term = search_term.strip()
-                
-                if original_term != search_term:
-                    logger.info(f"🧹 CLEANED SEARCH TERM: '{original_term}' -> '{search_term}'")
-            
-            # Enhanced fallback for travel/booking scenarios
-            if not search_term or len(search_term.strip()) == 0:
-                # Try to extract meaningful travel-related content
-                cleaned_cmd = re.sub(r'(go to|open|visit|navigate to)\s+[^\s]+(?:\.[a-z]{2,})?\s*(and\s*)?', '', cmd, flags=re.IGNORECASE)
-                cleaned_cmd = re.sub(r'\b(search|find|look)(?:\s+me)?\s*', '', cleaned_cmd, flags=re.IGNORECASE).strip()
-                
-                # Look for travel patterns
-                if any(word in cleaned_cmd for word in ['delhi', 'bangalore', 'mumbai', 'flight', 'ticket', 'hotel', 'to']):
-                    search_term = cleaned_cmd
-                else:
-                    search_term = cleaned_cmd if cleaned_cmd else "trending"
-            
-            logger.info(f"🔍 FINAL SEARCH TERM: '{search_term}' from command: '{cmd}'")
-            
-            return {
-                "action": "search",
-                "target": search_term,
-                "strategy": "locate_search_box_and_search",
-                "flow_type": "complex",
-                "viewing_time": 8,  # Reduced time for auto-close
-                "auto_close": True,  # Enable auto-close for search operations
-                "description": f"Search for '{search_term}'"
-            }
-        
-        elif any(word in cmd for word in ["login", "sign in", "log in"]):
-            return {
-                "action": "login",
-                "strategy": "locate_login_elements",
-                "flow_type": "complex",
-                "viewing_time": 20,
-                "auto_close": False,
-                "description": "Login flow automation"
-            }
-        
-        elif any(word in cmd for word in ["buy", "purchase", "add to cart"]):
-            product = re.search(r'buy (.+)|purchase (.+)|add (.+) to cart', cmd)
-            product_name = product.group(1) or product.group(2) or product.group(3) if product else "item"
-            return {
-                "action": "purchase",
-                "target": product_name,
-                "strategy": "search_and_add_to_cart",
-                "flow_type": "complex",
-                "viewing_time": 25,
-                "auto_close": False,
-                "description": f"Purchase flow for '{product_name}'"
-            }
-        
-        else:
-            # Default to simple navigation for unclear commands
-            return {
-                "action": "simple_navigation",
-                "strategy": "open_verify_close",
-                "flow_type": "simple", 
-                "viewing_time": 5,
-                "auto_close": True,
-                "description": f"Simple navigation to {target_url}"
-            }
+        return dict(_analyze_command(cmd, target_url))
     
-    async def execute_automation(self, voice_command: str, target_url: str):
-        """Execute automation using our visible browser"""
+    async def execute_automation(self, voice_command: str, target_url: str, demo_mode: bool = False,
+                                 events: Optional[asyncio.Queue] = None) -> tuple[list, dict]:
+        """Execute automation using our visible browser; returns (step results, strategy used)
+        
+        When ``events`` is given, each step result is also put on it as ("step", result)
+        as soon as the step finishes.
+        """
         logger.info(f"🎯 Executing automation: '{voice_command}' on {target_url}")
         
         results = []
         
-        # Step 1: Start visible browser
-        await self.start_visible_browser()
-        results.append({"step": "browser_startup", "success": True, "details": "Visible browser launched"})
+        async def record(step: dict):
+            results.append(step)
+            if events is not None:
+                await events.put(("step", step))
         
-        # Step 2: Get MCP strategy
-        strategy = await self.get_mcp_strategy(voice_command, target_url)
-        results.append({"step": "strategy_analysis", "success": True, "details": f"Strategy: {strategy['action']}"})
+        # Steps 1+2: Start visible browser and get MCP strategy; they're independent, so overlap them
+        _, strategy = await asyncio.gather(
+            self.start_visible_browser(),
+            self.get_mcp_strategy(voice_command, target_url),
+        )
+        self._last_strategy = strategy
+        await record({"step": "browser_startup", "success": True, "details": "Visible browser launched"})
+        await record({"step": "strategy_analysis", "success": True, "details": f"Strategy: {strategy['action']}"})
+        
+        # Simple navigation only verifies the page loads; don't fetch media for it
+        if strategy["flow_type"] == "simple":
+            await self.context.route("**/*", _abort_heavy_resources)
         
         # Step 3: Navigate to target URL
         logger.info(f"📍 Navigating to: {target_url}")
-        await self.page.goto(target_url)
-        await asyncio.sleep(2)  # Let page load visibly
-        results.append({"step": "navigation", "success": True, "details": f"Navigated to {target_url}"})
+        await self.page.goto(target_url)  # Waits for "load", which follows DOMContentLoaded
+        await record({"step": "navigation", "success": True, "details": f"Navigated to {target_url}"})
         
         # Step 4: Execute strategy-based automation
         automation_success = True
         if strategy["action"] == "simple_navigation":
             # Simple navigation: just verify page loaded
             logger.info(f"✅ Simple navigation completed to {target_url}")
-            results.append({"step": "simple_navigation", "success": True, "details": strategy["description"]})
+            await record({"step": "simple_navigation", "success": True, "details": strategy["description"]})
             
         elif strategy["action"] == "search":
             automation_success = await self.perform_search(strategy["target"])
-            results.append({"step": "search_execution", "success": automation_success, "details": f"Searched for: {strategy['target']}"})
+            await record({"step": "search_execution", "success": automation_success, "details": f"Searched for: {strategy['target']}"})
         
         elif strategy["action"] == "login":
             automation_success = await self.perform_login()
-            results.append({"step": "login_attempt", "success": automation_success, "details": "Login form interaction"})
+            await record({"step": "login_attempt", "success": automation_success, "details": "Login form interaction"})
         
         elif strategy["action"] == "purchase":
             automation_success = await self.perform_purchase(strategy["target"])
-            results.append({"step": "purchase_flow", "success": automation_success, "details": f"Purchase flow for: {strategy['target']}"})
-        
-        # Step 5: Smart viewing time based on flow type
-        viewing_time = strategy.get("viewing_time", 10)
-        if strategy["flow_type"] == "simple":
-            logger.info(f"⚡ Simple flow: Keeping browser open for {viewing_time} seconds to verify...")
-        else:
-            logger.info(f"⏰ Complex flow: Keeping browser open for {viewing_time} seconds for user interaction...")
+            await record({"step": "purchase_flow", "success": automation_success, "details": f"Purchase flow for: {strategy['target']}"})
         
-        await asyncio.sleep(viewing_time)
+        # Step 5: Smart viewing time based on flow type (demo only; API calls don't wait)
+        if demo_mode:
+            viewing_time = strategy.get("viewing_time", 10)
+            if strategy["flow_type"] == "simple":
+                logger.info(f"⚡ Simple flow: Keeping browser open for {viewing_time} seconds to verify...")
+            else:
+                logger.info(f"⏰ Complex flow: Keeping browser open for {viewing_time} seconds for user interaction...")
+            
+            await asyncio.sleep(viewing_time)
         
-        # Step 6: Take screenshot for proof
+        # Step 6: Take screenshot for proof; awaited so the step reports whether the file was written
+        # Fixed-length name per URL, however long or odd the URL is
+        url_digest = hashlib.blake2b(target_url.encode(), digest_size=8).hexdigest()
+        screenshot_path = f"automation_proof_{url_digest}.jpg"
         try:
-            screenshot_path = f"automation_proof_{target_url.replace('://', '_').replace('/', '_')}.png"
-            await self.page.screenshot(path=screenshot_path)
-            results.append({"step": "screenshot", "success": True, "details": f"Screenshot saved: {screenshot_path}"})
+            await self.page.screenshot(path=screenshot_path, type='jpeg', quality=70)
+            await record({"step": "screenshot", "success": True, "details": f"Screenshot saved: {screenshot_path}"})
         except Exception as e:
             logger.warning(f"Screenshot failed: {e}")
-            results.append({"step": "screenshot", "success": False, "details": "Screenshot failed - browser may have closed"})
+            await record({"step": "screenshot", "success": False, "details": f"Screenshot failed: {e}"})
         
         # Step 7: Auto-close browser and show test completion
         if strategy["flow_type"] == "simple":
@@ -302,36 +538,32 @@ class HybridAutomationEngine:
         else:
             logger.info("✅ COMPLEX AUTOMATION TEST PASSED: Task completed successfully and browser auto-closed")
         
-        return results
+        return results, strategy
+    
+    async def wait_for_settle(self, timeout: int = 5000):
+        """Wait for the page to go network-idle; pages that never do just time out"""
+        try:
+            await self.page.wait_for_load_state('networkidle', timeout=timeout)
+        except PWTimeoutError:
+            pass
     
     async def perform_search(self, search_term: str):
         """Intelligent search using common search patterns"""
         try:
             logger.info(f"🔍 Searching for: {search_term}")
             
-            # Common search selectors (most websites use these patterns)
-            search_selectors = [
-                'input[name="q"]',           # Google, YouTube
-                'input[name="search"]',      # Generic
-                'input[placeholder*="search" i]',  # By placeholder
-                'input[type="search"]',      # HTML5 search
-                '#search', '.search-input', '[data-testid="search"]'
-            ]
-            
-            for selector in search_selectors:
-                try:
-                    search_box = await self.page.wait_for_selector(selector, timeout=2000)
-                    if search_box:
-                        logger.info(f"✅ Found search box with selector: {selector}")
-                        await search_box.fill(search_term)
-                        await search_box.press('Enter')
-                        await asyncio.sleep(3)  # Wait for search results
-                        return True
-                except:
-                    continue
+            search_box = self.page.locator(_SEARCH_BOX_SELECTOR).filter(visible=True).first
+            try:
+                await search_box.wait_for(state='visible', timeout=2000)
+            except PWTimeoutError:
+                logger.warning("⚠️ No search box found with common selectors")
+                return False
             
-            logger.warning("⚠️ No search box found with common selectors")
-            return False
+            logger.info("✅ Found search box")
+            await search_box.fill(search_term)
+            await search_box.press('Enter')
+            await self.wait_for_settle()  # Wait for search results
+            return True
             
         except Exception as e:
             logger.error(f"❌ Search failed: {e}")
@@ -343,24 +575,16 @@ class HybridAutomationEngine:
             logger.info("🔐 Looking for login elements...")
             
             # Look for login/sign-in buttons or links
-            login_selectors = [
-                'a[href*="login"]', 'a[href*="signin"]',
-                'button:has-text("Login")', 'button:has-text("Sign In")',
-                '[data-testid="login"]', '.login-btn'
-            ]
+            login_element = self.page.locator(_LOGIN_SELECTOR).filter(visible=True).first
+            try:
+                await login_element.wait_for(state='visible', timeout=2000)
+            except PWTimeoutError:
+                return False
             
-            for selector in login_selectors:
-                try:
-                    login_element = await self.page.wait_for_selector(selector, timeout=2000)
-                    if login_element:
-                        logger.info(f"✅ Found login element: {selector}")
-                        await login_element.click()
-                        await asyncio.sleep(2)
-                        return True
-                except:
-                    continue
-            
-            return False
+            logger.info("✅ Found login element")
+            await login_element.click()
+            await self.wait_for_settle()
+            return True
             
         except Exception as e:
             logger.error(f"❌ Login detection failed: {e}")
@@ -374,26 +598,17 @@ class HybridAutomationEngine:
             # First try to search for the product
             search_success = await self.perform_search(product_name)
             if search_success:
-                await asyncio.sleep(3)
-                
                 # Look for product links or add to cart buttons
-                product_selectors = [
-                    'button:has-text("Add to Cart")',
-                    'button:has-text("Buy Now")',
-                    '[data-testid="add-to-cart"]',
-                    '.add-to-cart-btn'
-                ]
+                product_btn = self.page.locator(_PURCHASE_BUTTON_SELECTOR).filter(visible=True).first
+                try:
+                    await product_btn.wait_for(state='visible', timeout=3000)
+                except PWTimeoutError:
+                    return False
                 
-                for selector in product_selectors:
-                    try:
-                        product_btn = await self.page.wait_for_selector(selector, timeout=3000)
-                        if product_btn:
-                            logger.info(f"✅ Found purchase button: {selector}")
-                            await product_btn.click()
-                            await asyncio.sleep(2)
-                            return True
-                    except:
-                        continue
+                logger.info("✅ Found purchase button")
+                await product_btn.click()
+                await self.wait_for_settle()
+                return True
             
             return False
             
@@ -406,86 +621,105 @@ class HybridAutomationEngine:
         try:
             if self.page:
                 await self.page.close()
-            if self.context:
-                await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
-            if self.mcp_client:
-                await self.mcp_client.close()
+            if self._release_context:
+                # Closes the context; the browser itself goes back to the pool
+                await self._release_context()
         except Exception as e:
             logger.error(f"Cleanup error: {e}")
+        finally:
+            self.page = None
+            self.context = None
+            self._release_context = None
+
+# Platforms whose search commands go straight to the platform itself,
+# in priority order when a command names more than one
+_SEARCH_SITE_MAP = {
+    "youtube": "https://youtube.com",
+    "google": "https://google.com",
+}
+_SEARCH_SITE_KEYS = frozenset(_SEARCH_SITE_MAP)
+
+# Bare platform names accepted as a domain ("open youtube" -> youtube.com)
+_PLATFORM_NAMES = frozenset({"youtube", "google", "facebook", "twitter", "instagram"})
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Enhanced URL patterns for ANY website (not just hardcoded ones), fused into one
+# alternation so a single left-to-right scan finds candidates for all of them
+_URL_RE = re.compile(
+    # Pattern 1: Full URLs with protocol
+    r'(?P<full>https?://[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,}(?:/[^\s]*)?)'
+    # Pattern 2: Direct domain mentions (most common) - stop at "search" keyword
+    r'|(?:visit|go to|open|navigate to)\s+(?P<verb>[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})(?:\s+|$)'
+    # Pattern 3: Domains mentioned anywhere in command
+    r'|\b(?P<tld>[a-zA-Z0-9\-\.]+\.(?:com|org|net|edu|gov|io|co|in|uk|de|fr|au|ca|jp|cn|br|mx|es|it|ru))\b'
+    # Pattern 4: Handle "make my trip" -> "makemytrip.com" type conversions (but stop before search)
+    r'|(?:go to|visit|open)\s+(?P<phrase>[^.]+?)(?:\s+search|\s+and|\s*$)'
+)
+# Pattern priority: an earlier pattern wins wherever it matches in the command
+_URL_PATTERN_RANK = {"full": 1, "verb": 2, "tld": 3, "phrase": 4}
 
-# Global automation engine
-automation_engine = HybridAutomationEngine()
+# Common words that aren't domains
+_SKIP_WORDS = frozenset({'and', 'search', 'find', 'look', 'for', 'me', 'my', 'the', 'a', 'an'})
+
+_TRAILING_WORDS_RE = re.compile(r'\s+(and|search|find).*$', re.IGNORECASE)
 
 def extract_target_url(voice_command: str) -> str:
     """Extract target URL from voice command - UNIVERSAL approach for ANY website"""
-    cmd = voice_command.lower()
-    
     logger.info(f"🌐 UNIVERSAL URL EXTRACTION from: '{voice_command}'")
     
-    # Special handling for known platforms with search commands
-    if 'youtube' in cmd and 'search' in cmd:
-        logger.info("✅ YouTube search pattern detected")
-        return "https://youtube.com"
+    return _extract_target_url(_normalize_command(voice_command))
+
+@functools.lru_cache(maxsize=1024)
+def _extract_target_url(cmd: str) -> str:
+    """Target URL for a normalized command; pure, so results are cached"""
+    # Special handling for known platforms with search commands.
+    # Whole-word tokens, so "amazonite" or "googled" don't count as the site.
+    mask = _intent_mask(cmd)
+    tokens = set(_TOKEN_RE.findall(cmd))
+    hits = _SEARCH_SITE_KEYS & tokens
+    if hits and mask & _KW_BIT["search"]:
+        site = next(site for site in _SEARCH_SITE_MAP if site in hits)
+        logger.info(f"✅ {site} search pattern detected")
+        return _SEARCH_SITE_MAP[site]
     
-    if 'google' in cmd and 'search' in cmd:
-        logger.info("✅ Google search pattern detected")
-        return "https://google.com"
+    extracted_url = None
+    best_rank = None
     
-    # Enhanced URL patterns for ANY website (not just hardcoded ones)
-    url_patterns = [
-        # Pattern 1: Full URLs with protocol
-        r'(https?://[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,}(?:/[^\s]*)?)',
+    # Take the first match that looks like a domain, from the highest-priority pattern
+    for match in _URL_RE.finditer(cmd):
+        rank = _URL_PATTERN_RANK[match.lastgroup]
+        if best_rank is not None and rank >= best_rank:
+            continue
         
-        # Pattern 2: Direct domain mentions (most common) - stop at "search" keyword
-        r'(?:visit|go to|open|navigate to)\s+([a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})(?:\s+|$)',
+        potential_url = match.group(match.lastgroup).strip()
         
-        # Pattern 3: Domains mentioned anywhere in command
-        r'\b([a-zA-Z0-9\-\.]+\.(?:com|org|net|edu|gov|io|co|in|uk|de|fr|au|ca|jp|cn|br|mx|es|it|ru))\b',
+        if potential_url in _SKIP_WORDS:
+            continue
         
-        # Pattern 4: Handle "make my trip" -> "makemytrip.com" type conversions (but stop before search)
-        r'(?:go to|visit|open)\s+([^.]+?)(?:\s+search|\s+and|\s*$)',
-    ]
-    
-    extracted_url = None
+        # Handle special cases like "make my trip" -> "makemytrip.com"
+        if ' ' in potential_url and not potential_url.startswith('http'):
+            # Convert "make my trip" to "makemytrip.com"
+            potential_url = potential_url.replace(' ', '').replace('-', '') + '.com'
+        
+        # Ensure it has a valid TLD or is a recognizable platform
+        if '.' in potential_url or potential_url.startswith('http') or potential_url in _PLATFORM_NAMES:
+            # Handle single word platforms
+            if potential_url in _PLATFORM_NAMES:
+                potential_url = f"{potential_url}.com"
+            
+            extracted_url = potential_url
+            best_rank = rank
+            if rank == 1:
+                break
     
-    for i, pattern in enumerate(url_patterns, 1):
-        matches = re.findall(pattern, cmd)
-        if matches:
-            # Take the first match that looks like a domain
-            for match in matches:
-                potential_url = match.strip()
-                
-                # Skip common words that aren't domains
-                skip_words = ['and', 'search', 'find', 'look', 'for', 'me', 'my', 'the', 'a', 'an']
-                if potential_url.lower() in skip_words:
-                    continue
-                
-                # Handle special cases like "make my trip" -> "makemytrip.com"
-                if ' ' in potential_url and not potential_url.startswith('http'):
-                    # Convert "make my trip" to "makemytrip.com"
-                    potential_url = potential_url.replace(' ', '').replace('-', '') + '.com'
-                
-                # Ensure it has a valid TLD or is a recognizable platform
-                if '.' in potential_url or potential_url.startswith('http') or potential_url in ['youtube', 'google', 'facebook']:
-                    # Handle single word platforms
-                    if potential_url in ['youtube', 'google', 'facebook', 'twitter', 'instagram']:
-                        potential_url = f"{potential_url}.com"
-                    
-                    extracted_url = potential_url
-                    logger.info(f"✅ Pattern {i} matched: '{extracted_url}'")
-                    break
-        
-        if extracted_url:
-            break
+    if extracted_url:
+        logger.info(f"✅ Pattern {best_rank} matched: '{extracted_url}'")
     
     # Intelligent domain normalization
     if extracted_url:
         # Remove any trailing "and" or other words
-        extracted_url = re.sub(r'\s+(and|search|find).*$', '', extracted_url, flags=re.IGNORECASE).strip()
+        extracted_url = _TRAILING_WORDS_RE.sub('', extracted_url).strip()
         
         # Add protocol if missing
         if not extracted_url.startswith('http'):
@@ -511,24 +745,184 @@ def extract_target_url(voice_command: str) -> str:
                 return potential_domain
     
     # LAST RESORT: Default to Google for search commands
-    if any(word in cmd for word in ['search', 'find', 'look']):
+    if mask & _SEARCH_MASK:
         logger.info("🔄 SEARCH FALLBACK: Defaulting to Google")
         return "https://google.com"
     
     # Absolute fallback
-    logger.warning(f"⚠️ NO URL EXTRACTED from '{voice_command}', defaulting to Google")
+    logger.warning(f"⚠️ NO URL EXTRACTED from '{cmd}', defaulting to Google")
     return "https://google.com"
 
 @app.get("/", response_class=HTMLResponse)
 async def get_interface():
     """Serve the voice interface"""
-    with open("heyq/webapp/static/index.html", "r") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content)
+    return HTMLResponse(content=_INDEX_HTML)
+
+@app.on_event("startup")
+async def start_playwright():
+    """Start the Playwright driver once; every browser launch reuses it"""
+    await get_playwright()
+
+@app.on_event("startup")
+async def warm_browser_pool():
+    """Launch pooled browsers before the first voice command arrives"""
+    try:
+        await browser_pool.warm_up()
+    except Exception as e:
+        logger.warning(f"Browser pool warm-up failed, browsers will launch on demand: {e}")
+
+@app.on_event("shutdown")
+async def drain_browser_pool():
+    await browser_pool.drain()
+
+@app.on_event("shutdown")
+async def stop_playwright():
+    global _PW
+    if _PW:
+        await _PW.stop()
+        _PW = None
+
+@app.on_event("startup")
+async def start_mcp_client():
+    """Spawn the shared MCP server up front so requests never pay for it"""
+    await get_mcp_client()
+
+@app.on_event("shutdown")
+async def close_mcp_client():
+    global _mcp_client
+    if _mcp_client:
+        await _mcp_client.close()
+        _mcp_client = None
+
+# Recent /api/run responses keyed by (normalized utterance, headed): repeats skip the browser
+_result_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+_result_cache_lock = asyncio.Lock()
+_result_cache_hits = 0
+_result_cache_misses = 0
+
+# Flows with side effects on the target site always run for real
+_UNCACHED_ACTIONS = frozenset({"login", "purchase"})
+
+async def get_cached_result(key: Tuple[str, bool]) -> Optional[Dict[str, Any]]:
+    """Cached /api/run response for this key, if one is still fresh"""
+    global _result_cache_hits, _result_cache_misses
+    async with _result_cache_lock:
+        response = _result_cache.get(key)
+        if response is None:
+            _result_cache_misses += 1
+        else:
+            _result_cache_hits += 1
+        return response
+
+async def cache_result(key: Tuple[str, bool], response: Dict[str, Any]):
+    async with _result_cache_lock:
+        _result_cache[key] = response
+
+def _build_run_response(voice_command: str, target_url: str, strategy: dict,
+                        automation_results: list, headed: bool) -> Dict[str, Any]:
+    """Summarize a finished automation as the /api/run response payload"""
+    # Calculate success metrics
+    successful_steps = sum(1 for r in automation_results if r["success"])
+    total_steps = len(automation_results)
+    
+    # Create detailed verification results for UI display
+    if strategy["flow_type"] == "simple":
+        # Simple navigation - should auto-close and show PASSED
+        success_message = f"✅ TEST PASSED! Successfully opened {target_url}, verified page load, and auto-closed browser."
+        status = "PASSED"
+        verification_results = {
+            "test_status": "PASS",
+            "message": f"✅ Simple Navigation Test PASSED",
+            "user_message": f"Successfully opened {target_url} and verified page load",
+            "details": f"Browser auto-closed after verification ({successful_steps}/{total_steps} steps successful)",
+            "action": "simple_navigation",
+            "auto_closed": True,
+            "target_url": target_url,
+            "test_type": "Navigation Test"
+        }
+    else:
+        # Complex automation - might stay open for user interaction
+        if strategy["action"] == "search":
+            success_message = f"✅ TEST PASSED! Successfully searched for '{strategy['target']}' on {target_url}. Browser auto-closed."
+            status = "PASSED"
+            verification_results = {
+                "test_status": "PASS", 
+                "message": f"✅ Search Test PASSED",
+                "user_message": f"Successfully searched for '{strategy['target']}' on {target_url}",
+                "details": f"Search completed and browser auto-closed ({successful_steps}/{total_steps} steps successful)",
+                "action": "search_automation",
+                "search_term": strategy['target'],
+                "auto_closed": True,
+                "target_url": target_url,
+                "test_type": "Search Test"
+            }
+        else:
+            success_message = f"🔄 COMPLEX TEST EXECUTED! Browser performed {strategy['description']} on {target_url}."
+            status = "COMPLETED"
+            verification_results = {
+                "test_status": "PASS",
+                "message": f"✅ Complex Automation Test PASSED", 
+                "user_message": f"Successfully completed {strategy['description']} on {target_url}",
+                "details": f"Complex automation completed ({successful_steps}/{total_steps} steps successful)",
+                "action": strategy["action"],
+                "auto_closed": True,
+                "target_url": target_url,
+                "test_type": "Complex Automation Test"
+            }
+    
+    return {
+        "ok": True,
+        "hybrid_automation": True,
+        "voice_command": voice_command,
+        "target_url": target_url,
+        "flow_type": strategy["flow_type"],
+        "strategy": strategy,
+        "automation_status": status,
+        "visible_browser": headed,
+        "automation_results": automation_results,
+        "success_message": success_message,
+        "verification": verification_results,  # Add verification for UI display
+        "approach": "Smart AI flow detection + Visible Playwright automation"
+    }
+
+async def _stream_automation(automation_engine: HybridAutomationEngine, voice_command: str,
+                             target_url: str, request: VoiceRequest):
+    """Server-Sent Events: one "step" event per finished step, then a final "result" event"""
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def run():
+        try:
+            try:
+                automation_results, strategy = await automation_engine.execute_automation(
+                    voice_command, target_url, demo_mode=request.demo_mode, events=events
+                )
+                result = _build_run_response(voice_command, target_url, strategy, automation_results, request.headed)
+            except Exception as e:
+                logger.error(f"❌ Hybrid automation failed: {e}")
+                result = {"ok": False, "error": f"Hybrid automation failed: {str(e)}"}
+            await events.put(("result", result))
+            await events.put(None)
+        finally:
+            await automation_engine.cleanup()
+    
+    task = asyncio.create_task(run())
+    try:
+        while (event := await events.get()) is not None:
+            name, payload = event
+            yield f"event: {name}\ndata: {orjson.dumps(payload).decode()}\n\n"
+    finally:
+        # Client went away mid-run: stop the automation (cleanup still runs)
+        if not task.done():
+            task.cancel()
 
 @app.post("/api/run")
-async def hybrid_voice_automation(request: VoiceRequest):
+async def hybrid_voice_automation(request: VoiceRequest, background_tasks: BackgroundTasks):
     """Main endpoint for hybrid AI+MCP+Playwright automation"""
+    # One engine per request so concurrent commands don't share a page
+    automation_engine = HybridAutomationEngine(
+        headed=request.headed,
+        slow_mo=min(max(request.slow_mo_ms, 0), _MAX_SLOW_MO_MS)
+    )
     try:
         voice_command = request.utterance.strip()
         logger.info(f"🎤 HYBRID VOICE COMMAND: '{voice_command}' (headed={request.headed}, AI={request.use_ai})")
@@ -536,82 +930,37 @@ async def hybrid_voice_automation(request: VoiceRequest):
         if not voice_command:
             raise HTTPException(status_code=400, detail="Empty voice command")
         
+        # Same command seen recently: answer from the cache without opening a browser
+        # (streams and demos exist to watch the run, so they always execute)
+        cache_key = (_normalize_command(voice_command), request.headed)
+        if not (request.stream or request.demo_mode):
+            cached = await get_cached_result(cache_key)
+            if cached is not None:
+                logger.info(f"♻️ Returning cached result for: '{voice_command}'")
+                return cached
+        
         # Extract target URL
         target_url = extract_target_url(voice_command)
         logger.info(f"🎯 Target URL: {target_url}")
         
-        # Execute hybrid automation
-        automation_results = await automation_engine.execute_automation(voice_command, target_url)
+        # Opt-in live progress; the stream's task owns cleanup from here on
+        if request.stream:
+            return StreamingResponse(
+                _stream_automation(automation_engine, voice_command, target_url, request),
+                media_type="text/event-stream"
+            )
         
-        # Get the strategy for response info
-        strategy = automation_engine.analyze_voice_command(voice_command, target_url)
+        # Execute hybrid automation
+        automation_results, strategy = await automation_engine.execute_automation(voice_command, target_url, demo_mode=request.demo_mode)
         
-        # Clean up
-        await automation_engine.cleanup()
+        # Clean up after the response is sent
+        background_tasks.add_task(automation_engine.cleanup)
         
-        # Calculate success metrics
-        successful_steps = sum(1 for r in automation_results if r["success"])
-        total_steps = len(automation_results)
-        
-        # Create detailed verification results for UI display
-        if strategy["flow_type"] == "simple":
-            # Simple navigation - should auto-close and show PASSED
-            success_message = f"✅ TEST PASSED! Successfully opened {target_url}, verified page load, and auto-closed browser."
-            status = "PASSED"
-            verification_results = {
-                "test_status": "PASS",
-                "message": f"✅ Simple Navigation Test PASSED",
-                "user_message": f"Successfully opened {target_url} and verified page load",
-                "details": f"Browser auto-closed after verification ({successful_steps}/{total_steps} steps successful)",
-                "action": "simple_navigation",
-                "auto_closed": True,
-                "target_url": target_url,
-                "test_type": "Navigation Test"
-            }
-        else:
-            # Complex automation - might stay open for user interaction
-            if strategy["action"] == "search":
-                success_message = f"✅ TEST PASSED! Successfully searched for '{strategy['target']}' on {target_url}. Browser auto-closed."
-                status = "PASSED"
-                verification_results = {
-                    "test_status": "PASS", 
-                    "message": f"✅ Search Test PASSED",
-                    "user_message": f"Successfully searched for '{strategy['target']}' on {target_url}",
-                    "details": f"Search completed and browser auto-closed ({successful_steps}/{total_steps} steps successful)",
-                    "action": "search_automation",
-                    "search_term": strategy['target'],
-                    "auto_closed": True,
-                    "target_url": target_url,
-                    "test_type": "Search Test"
-                }
-            else:
-                success_message = f"🔄 COMPLEX TEST EXECUTED! Browser performed {strategy['description']} on {target_url}."
-                status = "COMPLETED"
-                verification_results = {
-                    "test_status": "PASS",
-                    "message": f"✅ Complex Automation Test PASSED", 
-                    "user_message": f"Successfully completed {strategy['description']} on {target_url}",
-                    "details": f"Complex automation completed ({successful_steps}/{total_steps} steps successful)",
-                    "action": strategy["action"],
-                    "auto_closed": True,
-                    "target_url": target_url,
-                    "test_type": "Complex Automation Test"
-                }
-        
-        return {
-            "ok": True,
-            "hybrid_automation": True,
-            "voice_command": voice_command,
-            "target_url": target_url,
-            "flow_type": strategy["flow_type"],
-            "strategy": strategy,
-            "automation_status": status,
-            "visible_browser": True,
-            "automation_results": automation_results,
-            "success_message": success_message,
-            "verification": verification_results,  # Add verification for UI display
-            "approach": "Smart AI flow detection + Visible Playwright automation"
-        }
+        response = _build_run_response(voice_command, target_url, strategy, automation_results, request.headed)
+        # Only replay runs where every step worked; a transient failure should be retried
+        if strategy["action"] not in _UNCACHED_ACTIONS and all(r["success"] for r in automation_results):
+            await cache_result(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"❌ Hybrid automation failed: {e}")
@@ -621,6 +970,30 @@ async def hybrid_voice_automation(request: VoiceRequest):
             "error": f"Hybrid automation failed: {str(e)}"
         }
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the /api/run result cache and the shared MCP client"""
+    return {
+        "results": {
+            "hits": _result_cache_hits,
+            "misses": _result_cache_misses,
+            "size": len(_result_cache),
+            "maxsize": _result_cache.maxsize,
+            "ttl": _result_cache.ttl
+        },
+        "mcp_client": get_mcp_client_stats()
+    }
+
+@app.post("/api/demo")
+async def demo_voice_automation(request: VoiceRequest, background_tasks: BackgroundTasks):
+    """Presentation mode: visible browser, slowed-down actions and the strategy's viewing pause"""
+    demo_request = request.model_copy(update={
+        "headed": True,
+        "slow_mo_ms": _DEMO_SLOW_MO_MS,
+        "demo_mode": True
+    })
+    return await hybrid_voice_automation(demo_request, background_tasks)
+
 if __name__ == "__main__":
     print("🚀 Starting HYBRID AI+MCP+Playwright Voice Interface...")
     print("📍 URL: http://127.0.0.1:8082") 
@@ -5,11 +5,77 @@ This replaces our fake "EnhancedPlaywrightMCP" with actual MCP protocol communic
 import json
 import subprocess
 import asyncio
+import base64
+import copy
+import hashlib
+import itertools
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import time
 import uuid
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from loguru import logger
 
+try:
+    import orjson  # C encoder/decoder; snapshot and screenshot responses are large
+except ImportError:
+    orjson = None
+
+# Wire helpers: both produce/accept bytes, since the asyncio pipes speak bytes
+if orjson is not None:
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys).encode()
+    _loads = json.loads
+
+
+# Seconds a successful response stays reusable, keyed by JSON-RPC method or, for
+# tools/call, by tool name. Anything unlisted (navigate, click, fill, screenshot...)
+# acts on the page and is always sent.
+_TTL_BY_METHOD: Dict[str, float] = {
+    "tools/list": 3600,
+    "browser_snapshot": 1,  # Read-only; page-changing calls drop it anyway
+}
+_CACHE_MAX_ENTRIES = 512
+
+# Seconds to wait for the answer to a one-ping batch when batches are enabled.
+# Batch arrays aren't part of MCP "2024-11-05", and servers on the current SDK
+# drop them without replying, so clients pipeline requests unless told otherwise.
+_BATCH_PROBE_TIMEOUT = 5.0
+
+def _probe_node() -> Optional[str]:
+    """Installed Node.js version, or None if node can't be run"""
+    try:
+        node_check = subprocess.run(['node', '--version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return node_check.stdout.strip() if node_check.returncode == 0 else None
+
+# Playwright MCP server entry point (local build), overridable per machine
+_DEFAULT_MCP_PATH = os.environ.get("HEYQ_MCP_PATH", "/Users/bhanu.joshi/Desktop/HeyQ/playwright-mcp/cli.js")
+
+# Probed once at import so starting a server never blocks the event loop on a fork
+_NODE_VERSION = _probe_node()
+
+# Inline base64 payloads (screenshots) above this size are written to disk and
+# replaced by their path when a caller opts in with offload=True
+_OFFLOAD_MIN_CHARS = 64 * 1024
+
+# The distinctive part of a CSS selector: its last quoted value or #id/.class name
+_SELECTOR_NEEDLE_RE = re.compile(r'"([^"]+)"|[#.]([\w-]+)')
+
+# Snapshot entries for fields that take typed text, e.g. '- textbox "Email" [ref=e5]'
+_TEXT_FIELD_ENTRY_RE = re.compile(r'^\s*- (?:textbox|searchbox|combobox)\b.*$', re.MULTILINE)
+
 
 @dataclass
 class RealMCPResult:
@@ -17,7 +83,7 @@ class RealMCPResult:
     ok: bool
     data: Dict[str, Any] | None = None
     error: str | None = None
-    request_id: str | None = None
+    request_id: int | None = None
 
 
 class RealMCPClient:
@@ -26,38 +92,74 @@ class RealMCPClient:
     Uses JSON-RPC over stdio as per MCP specification
     """
     
-    def __init__(self):
-        self.process: Optional[subprocess.Popen] = None
-        self.request_counter = 0
+    def __init__(self, cache_ttl_overrides: Optional[Dict[str, float]] = None, isolated: bool = False,
+                 mcp_path: str = _DEFAULT_MCP_PATH, caps: Sequence[str] = (), batch_requests: bool = False):
+        self.process: Optional[asyncio.subprocess.Process] = None
+        # Send send_mcp_batch() requests as real JSON-RPC batch arrays, for servers known to take them
+        self.batch_requests = batch_requests
+        self.mcp_path = mcp_path
+        # Extra server capabilities (e.g. "vision"); off by default, each one adds startup work
+        self.caps = tuple(caps)
+        # In-memory browser profile, so several servers can run side by side
+        self.isolated = isolated
+        # JSON-RPC ids: plain ints, cheap to build, hash and serialize
+        self._next_id = itertools.count(1).__next__
+        # Requests in flight by JSON-RPC id; _reader_loop resolves them as responses arrive
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: deque = deque(maxlen=20)  # Last lines, for startup errors
+        self._blob_dir: Optional[str] = None  # Created on first offloaded payload
+        self._cache_ttls = {**_TTL_BY_METHOD, **(cache_ttl_overrides or {})}
+        self._cache: OrderedDict[str, tuple[float, RealMCPResult]] = OrderedDict()
+        # Whether the server answers JSON-RPC batch arrays; None until probed
+        self._batch_supported: Optional[bool] = None
+        self._batch_probe: Optional[asyncio.Future] = None
+        self._batch_probe_lock = asyncio.Lock()  # Concurrent first batches share one probe
         
+    def is_running(self) -> bool:
+        """Whether the MCP server process is alive and its responses are still being read"""
+        if self.process is None or self.process.returncode is not None:
+            return False
+        # Once the reader has exited no request can be answered, even if the process lives on
+        return self._reader_task is None or not self._reader_task.done()
+    
     async def start_mcp_server(self) -> bool:
         """Start the Microsoft Playwright MCP server"""
         try:
             # Check if Node.js is available
-            node_check = subprocess.run(['node', '--version'], 
-                                      capture_output=True, text=True)
-            if node_check.returncode != 0:
+            if _NODE_VERSION is None:
                 logger.error("❌ Node.js not found! MCP requires Node.js 18+")
                 return False
             
-            logger.info(f"✅ Node.js found: {node_check.stdout.strip()}")
+            logger.info(f"✅ Node.js found: {_NODE_VERSION}")
             
             # Start the Microsoft Playwright MCP server (using local build)
             logger.info("🚀 Starting Microsoft Playwright MCP server...")
-            mcp_path = "/Users/bhanu.joshi/Desktop/HeyQ/playwright-mcp/cli.js"
             
-            self.process = subprocess.Popen([
-                'node', mcp_path, 
-                '--browser', 'chrome',      # Use Chrome browser
-                '--caps', 'vision'          # Enable vision capabilities for navigation
-            ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, 
-               stderr=subprocess.PIPE, text=True, bufsize=0)
+            # Native asyncio pipes: reads and writes are awaited on the event loop,
+            # no worker thread is parked on readline()
+            server_args = ['--browser', 'chrome']  # Use Chrome browser
+            if self.caps:
+                server_args += ['--caps', ','.join(self.caps)]
+            if self.isolated:
+                server_args.append('--isolated')
+            
+            self.process = await asyncio.create_subprocess_exec(
+                'node', self.mcp_path, *server_args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=2**20                 # Read buffer per chunk; _read_line joins longer lines
+            )
+            self._stderr_task = asyncio.create_task(self._drain_stderr())
             
             # Wait a moment for server to start
             await asyncio.sleep(3)
             
-            if self.process.poll() is None:
+            if self.process.returncode is None:
                 logger.info("✅ Microsoft Playwright MCP server started successfully")
+                self._reader_task = asyncio.create_task(self._reader_loop())
                 
                 # Perform MCP initialization handshake
                 init_success = await self._initialize_mcp_session()
@@ -68,7 +170,9 @@ class RealMCPClient:
                     logger.error("❌ MCP session initialization failed")
                     return False
             else:
-                stderr_output = self.process.stderr.read() if self.process.stderr else "Unknown error"
+                # The server has exited; give the drain a moment to collect its last words
+                await asyncio.wait([self._stderr_task], timeout=1)
+                stderr_output = "\n".join(self._stderr_tail) or "Unknown error"
                 logger.error(f"❌ MCP server failed to start: {stderr_output}")
                 return False
                 
@@ -79,6 +183,98 @@ class RealMCPClient:
             logger.error(f"❌ Failed to start MCP server: {e}")
             return False
     
+    async def _read_line(self) -> bytes:
+        """Next line from server stdout, however long; b"" once stdout is closed
+        
+        readline() gives up on lines over the stream limit and drops them, and a
+        base64 screenshot response easily is one, so read it in limit-sized chunks.
+        """
+        stdout = self.process.stdout
+        chunks = []
+        while True:
+            try:
+                chunks.append(await stdout.readuntil(b"\n"))
+                return b"".join(chunks)
+            except asyncio.LimitOverrunError as e:
+                # The bytes checked so far are still buffered; take them and keep looking
+                chunks.append(await stdout.readexactly(e.consumed))
+            except asyncio.IncompleteReadError as e:
+                chunks.append(e.partial)  # EOF; a final unterminated line, if any
+                return b"".join(chunks)
+    
+    async def _reader_loop(self):
+        """Read responses off stdout and hand each one to the request waiting on its id"""
+        try:
+            while True:
+                line = await self._read_line()
+                if not line:
+                    break  # Server closed stdout
+                try:
+                    message = _loads(line)
+                except json.JSONDecodeError as e:  # orjson's error subclasses this
+                    logger.warning(f"⚠️ Ignoring invalid JSON from MCP server: {e}")
+                    continue
+                # A batch request is answered with one array holding every response
+                for response in message if isinstance(message, list) else (message,):
+                    if not isinstance(response, dict):
+                        logger.warning(f"⚠️ Ignoring non-object JSON-RPC message: {response!r:.200}")
+                        continue
+                    if "method" in response:
+                        continue  # Server-initiated request/notification, not a response
+                    if response.get("id") is None and "error" in response:
+                        # An error about no request in particular, e.g. a rejected batch array
+                        if self._batch_probe is not None and not self._batch_probe.done():
+                            self._batch_probe.set_result(False)
+                        logger.warning(f"⚠️ MCP server error: {response['error'].get('message')}")
+                        continue
+                    logger.debug("📥 MCP Response: {}", response)
+                    future = self._pending.pop(response.get("id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(response)
+        except Exception as e:
+            logger.error(f"❌ MCP response reader failed: {e}")
+        finally:
+            # Nothing more will arrive; fail whoever is still waiting
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the connection"))
+            self._pending.clear()
+    
+    async def _drain_stderr(self):
+        """Keep reading server stderr; once an unread pipe fills, the server blocks mid-request"""
+        stderr = self.process.stderr
+        while True:
+            try:
+                line = await stderr.readline()
+            except ValueError:
+                continue  # Over-long line; the stream drops it
+            if not line:
+                break
+            text = line.decode(errors="replace").rstrip()
+            self._stderr_tail.append(text)
+            logger.debug("🪵 MCP stderr: {}", text)
+    
+    def _offload_large_content(self, data: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+        """Copy of a tool result with big base64 ``data`` items in its content written to disk
+        
+        An offloaded item becomes {"type", "mimeType", "path"}; the files live until close().
+        Blocking (decode and write), so run it off the event loop.
+        """
+        content = data.get("content")
+        if not isinstance(content, list):
+            return data
+        
+        offloaded = list(content)
+        for index, item in enumerate(content):
+            blob = item.get("data") if isinstance(item, dict) else None
+            if not isinstance(blob, str) or len(blob) < _OFFLOAD_MIN_CHARS:
+                continue
+            suffix = mimetypes.guess_extension(item.get("mimeType") or "") or ".bin"
+            path = Path(self._blob_dir, f"{prefix}_{index}{suffix}")
+            path.write_bytes(base64.b64decode(blob))
+            offloaded[index] = {"type": item.get("type"), "mimeType": item.get("mimeType"), "path": str(path)}
+        return {**data, "content": offloaded}
+    
     async def _initialize_mcp_session(self) -> bool:
         """Initialize MCP session with proper handshake"""
         try:
@@ -112,7 +308,7 @@ class RealMCPClient:
     
     async def send_mcp_notification(self, method: str, params: Dict[str, Any]) -> bool:
         """Send MCP notification (no response expected)"""
-        if not self.process or self.process.poll() is not None:
+        if not self.is_running():
             return False
         
         # Construct JSON-RPC notification (no id field)
@@ -124,11 +320,11 @@ class RealMCPClient:
         
         try:
             # Send notification
-            notification_json = json.dumps(notification) + '\n'
-            logger.debug(f"📤 MCP Notification: {notification_json.strip()}")
+            notification_json = _dumps(notification) + b'\n'
+            logger.opt(lazy=True).debug("📤 MCP Notification: {}", lambda: notification_json[:-1].decode())
             
             self.process.stdin.write(notification_json)
-            self.process.stdin.flush()
+            await self.process.stdin.drain()
             
             return True
             
@@ -136,16 +332,50 @@ class RealMCPClient:
             logger.error(f"❌ MCP notification failed: {e}")
             return False
     
+    def _cache_ttl(self, method: str, params: Dict[str, Any]) -> float:
+        if method == "tools/call":
+            return self._cache_ttls.get(params.get("name"), 0)
+        return self._cache_ttls.get(method, 0)
+    
+    def _invalidate_tool_results(self):
+        """Forget cached tool output, e.g. after a call that may have changed the page"""
+        for key in [key for key in self._cache if key.startswith("tools/call:")]:
+            del self._cache[key]
+    
     async def send_mcp_request(self, method: str, params: Dict[str, Any]) -> RealMCPResult:
+        """Send JSON-RPC request to MCP server, reusing a fresh cached result where allowed"""
+        ttl = self._cache_ttl(method, params)
+        if ttl <= 0:
+            if method == "tools/call":
+                self._invalidate_tool_results()
+            return await self._send_mcp_request(method, params)
+        
+        digest = hashlib.blake2b(_dumps([method, params], sort_keys=True), digest_size=16).hexdigest()
+        key = f"{method}:{digest}"
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            self._cache.move_to_end(key)
+            logger.debug(f"♻️ MCP cache hit: {method}")
+            # Each caller gets its own copy, so mutating one can't corrupt the cache
+            return copy.deepcopy(cached[1])
+        
+        result = await self._send_mcp_request(method, params)
+        if result.ok:
+            self._cache[key] = (time.monotonic(), copy.deepcopy(result))
+            self._cache.move_to_end(key)
+            if len(self._cache) > _CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return result
+    
+    async def _send_mcp_request(self, method: str, params: Dict[str, Any]) -> RealMCPResult:
         """Send JSON-RPC request to MCP server"""
-        if not self.process or self.process.poll() is not None:
+        if not self.is_running():
             return RealMCPResult(
                 ok=False, 
                 error="MCP server not running"
             )
         
-        self.request_counter += 1
-        request_id = f"req_{self.request_counter}"
+        request_id = self._next_id()
         
         # Construct JSON-RPC request
         request = {
@@ -155,43 +385,22 @@ class RealMCPClient:
             "id": request_id
         }
         
+        # Register before writing so a fast response can't arrive unclaimed
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        
         try:
             # Send request
-            request_json = json.dumps(request) + '\n'
-            logger.debug(f"📤 MCP Request: {request_json.strip()}")
+            request_json = _dumps(request) + b'\n'
+            logger.opt(lazy=True).debug("📤 MCP Request: {}", lambda: request_json[:-1].decode())
             
             self.process.stdin.write(request_json)
-            self.process.stdin.flush()
-            
-            # Read response (with timeout)
-            response_line = await asyncio.wait_for(
-                asyncio.to_thread(self.process.stdout.readline), 
-                timeout=30.0
-            )
-            
-            if not response_line:
-                return RealMCPResult(
-                    ok=False,
-                    error="No response from MCP server",
-                    request_id=request_id
-                )
-            
-            # Parse JSON-RPC response
-            response = json.loads(response_line.strip())
-            logger.debug(f"📥 MCP Response: {response}")
+            await self.process.stdin.drain()
             
-            if "error" in response:
-                return RealMCPResult(
-                    ok=False,
-                    error=response["error"].get("message", "Unknown MCP error"),
-                    request_id=request_id
-                )
-            
-            return RealMCPResult(
-                ok=True,
-                data=response.get("result", {}),
-                request_id=request_id
-            )
+            # Wait for the reader to deliver our response (with timeout); other
+            # requests can be written and answered in the meantime
+            response = await asyncio.wait_for(future, timeout=30.0)
+            return self._response_to_result(response, request_id)
             
         except asyncio.TimeoutError:
             return RealMCPResult(
@@ -199,10 +408,10 @@ class RealMCPClient:
                 error="MCP request timeout",
                 request_id=request_id
             )
-        except json.JSONDecodeError as e:
+        except ConnectionError:
             return RealMCPResult(
                 ok=False,
-                error=f"Invalid JSON response: {e}",
+                error="No response from MCP server",
                 request_id=request_id
             )
         except Exception as e:
@@ -211,6 +420,115 @@ class RealMCPClient:
                 error=f"MCP communication error: {e}",
                 request_id=request_id
             )
+        finally:
+            self._pending.pop(request_id, None)
+    
+    @staticmethod
+    def _response_to_result(response: Dict[str, Any], request_id: int) -> RealMCPResult:
+        if "error" in response:
+            return RealMCPResult(
+                ok=False,
+                error=response["error"].get("message", "Unknown MCP error"),
+                request_id=request_id
+            )
+        
+        return RealMCPResult(
+            ok=True,
+            data=response.get("result", {}),
+            request_id=request_id
+        )
+    
+    async def _probe_batches(self):
+        """Send a one-ping batch and record whether the server answers it"""
+        loop = asyncio.get_running_loop()
+        request_id = self._next_id()
+        future = self._pending[request_id] = loop.create_future()
+        self._batch_probe = loop.create_future()  # The reader resolves it on a rejection
+        try:
+            self.process.stdin.write(_dumps([{"jsonrpc": "2.0", "method": "ping", "id": request_id}]) + b'\n')
+            await self.process.stdin.drain()
+            done, _ = await asyncio.wait({future, self._batch_probe}, timeout=_BATCH_PROBE_TIMEOUT,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            self._batch_supported = future in done and future.exception() is None
+        except Exception as e:
+            logger.debug("Batch probe failed: {}", e)
+            self._batch_supported = False
+        finally:
+            self._pending.pop(request_id, None)
+            future.cancel()
+            self._batch_probe = None
+        if not self._batch_supported:
+            logger.info("ℹ️ MCP server doesn't answer batches; sending them as pipelined requests")
+    
+    async def _supports_batches(self) -> bool:
+        """Whether the server answers batch arrays, probed on first use"""
+        async with self._batch_probe_lock:
+            if self._batch_supported is None:
+                await self._probe_batches()
+        return self._batch_supported
+    
+    async def send_mcp_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[RealMCPResult]:
+        """Send several JSON-RPC requests together; results are in request order
+        
+        By default the requests are pipelined: all written up front, answered as
+        they complete. With ``batch_requests`` they go out as one batch array,
+        falling back to pipelining if the server doesn't answer a probe batch.
+        Either way they bypass the response cache, and the server may run them in
+        any order, so only send calls that don't depend on each other.
+        """
+        if not self.is_running():
+            return [RealMCPResult(ok=False, error="MCP server not running") for _ in requests]
+        
+        if any(method == "tools/call" for method, _ in requests):
+            self._invalidate_tool_results()
+        
+        if not self.batch_requests or not await self._supports_batches():
+            # All written up front; the reader resolves each as its response arrives
+            return list(await asyncio.gather(*(
+                self._send_mcp_request(method, params) for method, params in requests
+            )))
+        
+        loop = asyncio.get_running_loop()
+        batch = []
+        futures: Dict[int, asyncio.Future] = {}
+        for method, params in requests:
+            request_id = self._next_id()
+            batch.append({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params,
+                "id": request_id
+            })
+            futures[request_id] = self._pending[request_id] = loop.create_future()
+        
+        try:
+            # One write for the whole batch; the reader resolves each future by id
+            batch_json = _dumps(batch) + b'\n'
+            logger.debug(f"📤 MCP Batch: {len(batch)} requests")
+            
+            self.process.stdin.write(batch_json)
+            await self.process.stdin.drain()
+            
+            await asyncio.wait(futures.values(), timeout=30.0)
+        except Exception as e:
+            return [
+                RealMCPResult(ok=False, error=f"MCP communication error: {e}", request_id=request_id)
+                for request_id in futures
+            ]
+        finally:
+            for request_id in futures:
+                self._pending.pop(request_id, None)
+        
+        results = []
+        for request_id, future in futures.items():
+            if not future.done():
+                future.cancel()
+                results.append(RealMCPResult(ok=False, error="MCP request timeout", request_id=request_id))
+            elif future.exception() is not None:
+                results.append(RealMCPResult(ok=False, error="No response from MCP server", request_id=request_id))
+            else:
+                results.append(self._response_to_result(future.result(), request_id))
+        return results
     
     async def playwright_navigate(self, url: str) -> RealMCPResult:
         """Navigate to URL using REAL MCP"""
@@ -233,12 +551,66 @@ class RealMCPClient:
             "arguments": {"selector": selector, "text": text}
         })
     
-    async def playwright_screenshot(self, name: str = "screenshot") -> RealMCPResult:
-        """Take screenshot using REAL MCP"""
+    async def browser_type(self, ref: str, element: str, text: str, submit: bool = False) -> RealMCPResult:
+        """Type into the snapshot element with this ref using REAL MCP, optionally pressing Enter"""
         return await self.send_mcp_request("tools/call", {
+            "name": "browser_type",
+            "arguments": {"ref": ref, "element": element, "text": text, "submit": submit}
+        })
+    
+    async def playwright_screenshot(self, name: str = "screenshot", offload: bool = False) -> RealMCPResult:
+        """Take screenshot using REAL MCP
+        
+        With ``offload``, large inline images are written to disk and returned as
+        {"type", "mimeType", "path"} items instead of spec-shaped base64 ``data``,
+        for callers that keep results around.
+        """
+        result = await self.send_mcp_request("tools/call", {
             "name": "playwright_screenshot",
             "arguments": {"name": name}
         })
+        if offload and result.ok and result.data:
+            if self._blob_dir is None:
+                self._blob_dir = tempfile.mkdtemp(prefix="heyq-mcp-")
+            result.data = await asyncio.to_thread(self._offload_large_content, result.data, str(result.request_id))
+        return result
+    
+    async def browser_snapshot(self) -> RealMCPResult:
+        """Accessibility snapshot of the current page using REAL MCP"""
+        return await self.send_mcp_request("tools/call", {
+            "name": "browser_snapshot",
+            "arguments": {}
+        })
+    
+    async def snapshot_text(self) -> Optional[str]:
+        """Text of the current page's accessibility snapshot, or None if it failed"""
+        snapshot = await self.browser_snapshot()
+        if not snapshot.ok:
+            return None
+        return "\n".join(
+            item.get("text", "") for item in snapshot.data.get("content", [])
+            if item.get("type") == "text"
+        )
+    
+    async def first_present(self, selectors: List[str]) -> Optional[str]:
+        """First selector whose distinctive value shows up in a text field of the page snapshot
+        
+        The snapshot lists roles and accessible names rather than CSS, so this is a
+        hint: None means "no idea", not "absent", and callers should fall back to
+        trying the selectors. Only textbox/searchbox/combobox entries are searched,
+        so a heading or nav link that happens to say "search" doesn't count.
+        """
+        text = await self.snapshot_text()
+        if text is None:
+            return None
+        text = "\n".join(_TEXT_FIELD_ENTRY_RE.findall(text)).lower()
+        
+        for selector in selectors:
+            needles = [quoted or name for quoted, name in _SELECTOR_NEEDLE_RE.findall(selector)]
+            # One- and two-letter values like name="q" would match any page
+            if needles and len(needles[-1]) >= 3 and needles[-1].lower() in text:
+                return selector
+        return None
     
     async def list_tools(self) -> RealMCPResult:
         """List available MCP tools"""
@@ -248,16 +620,27 @@ class RealMCPClient:
         """Shutdown MCP server"""
         if self.process:
             try:
-                self.process.terminate()
-                self.process.wait(timeout=5)
+                if self.process.returncode is None:
+                    self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), timeout=5)
                 logger.info("✅ MCP server shutdown complete")
-            except subprocess.TimeoutExpired:
+            except asyncio.TimeoutError:
                 self.process.kill()
+                await self.process.wait()
                 logger.warning("⚠️ MCP server force killed")
             except Exception as e:
                 logger.error(f"❌ Error shutting down MCP server: {e}")
             finally:
+                for task in (self._reader_task, self._stderr_task):
+                    if task:
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                self._reader_task = self._stderr_task = None
                 self.process = None
+                self._cache.clear()
+                if self._blob_dir:
+                    shutil.rmtree(self._blob_dir, ignore_errors=True)
+                    self._blob_dir = None
 
 
 # Example usage for testing
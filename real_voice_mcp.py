@@ -9,6 +9,7 @@ import json
 import re
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse, FileResponse
@@ -42,6 +43,38 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 def index():
     return FileResponse(str(STATIC_DIR / "index.html"))
 
+# Actions that need visual grounding; only their server is started with the vision caps
+_VISION_ACTIONS = {"click", "fill"}
+
+@app.on_event("startup")
+async def init_mcp_state():
+    app.state.mcp_lock = asyncio.Lock()
+    # Shared servers and their run locks, keyed by the caps they were started with
+    app.state.mcp_clients = {}
+    app.state.mcp_run_locks = {}
+
+@app.on_event("shutdown")
+async def close_mcp_client():
+    clients = list(app.state.mcp_clients.values())
+    app.state.mcp_clients.clear()
+    await asyncio.gather(*(client.close() for client in clients))
+
+async def get_mcp_client(caps: tuple = ()) -> RealMCPClient:
+    """Shared MCP client for this worker and caps, (re)starting the server if it isn't running"""
+    async with app.state.mcp_lock:
+        client = app.state.mcp_clients.get(caps)
+        if client is None or not client.is_running():
+            if client is not None:
+                await client.close()  # Its reader is gone; don't leave the server behind
+            client = RealMCPClient(caps=caps)
+            # Start Real Microsoft Playwright MCP server
+            if not await client.start_mcp_server():
+                await client.close()
+                raise Exception("Failed to start Real Microsoft Playwright MCP server")
+            app.state.mcp_clients[caps] = client
+            app.state.mcp_run_locks.setdefault(caps, asyncio.Lock())
+        return client
+
 @app.post("/api/run")
 async def real_voice_automation(payload: dict):
     """
@@ -69,14 +102,12 @@ async def real_voice_automation(payload: dict):
         
         logger.info(f"🎯 Target: {target_url} | Action: {action_type}")
         
-        # STEP 2: Execute REAL MCP automation
-        client = RealMCPClient()
-        
-        # Start Real Microsoft Playwright MCP server
-        if not await client.start_mcp_server():
-            raise Exception("Failed to start Real Microsoft Playwright MCP server")
+        # STEP 2: Execute REAL MCP automation on the worker's shared server
+        caps = ("vision",) if action_type in _VISION_ACTIONS else ()
+        client = await get_mcp_client(caps)
         
-        try:
+        # One browser tab behind each shared server, so automations take turns on it
+        async with app.state.mcp_run_locks[caps]:
             logger.info(f"🔧 Connected to REAL Microsoft Playwright MCP")
             
             results = []
@@ -94,10 +125,6 @@ async def real_voice_automation(payload: dict):
             if nav_result.ok:
                 logger.info(f"✅ SUCCESS: Real browser opened {target_url}")
                 
-                # Keep browser alive for 10 seconds so user can see it
-                logger.info("⏰ Keeping browser open for 10 seconds...")
-                await asyncio.sleep(10)
-                
                 # Take screenshot for proof
                 screenshot_result = await client.playwright_screenshot("real_voice_automation")
                 results.append({
@@ -159,9 +186,6 @@ async def real_voice_automation(payload: dict):
                     "ok": False,
                     "error": f"Failed to navigate to {target_url}: {nav_result.error}"
                 }, status_code=500)
-                
-        finally:
-            await client.close()
             
     except Exception as e:
         logger.exception(f"❌ REAL AI+MCP automation failed: {e}")
@@ -171,21 +195,60 @@ async def real_voice_automation(payload: dict):
         }, status_code=500)
 
 
+# Direct URL patterns, most explicit first
+_URL_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(https?://[^\s]+)',
+    r'(www\.[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'(?:visit|go to|open|navigate to)\s+([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'(?:on|at)\s+([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'\b([a-zA-Z0-9.-]+\.(?:com|org|net|edu|gov|io|co)\b)'
+)]
+
+# Action keywords in priority order; two-word entries match adjacent words
+_ACTION_SETS = (
+    ("search", frozenset({"search", "find", "look for"})),
+    ("login", frozenset({"login", "log in", "sign in"})),
+    ("click", frozenset({"click", "press", "tap"})),
+    ("fill", frozenset({"type", "fill", "enter"})),
+)
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Smart website mapping for common references
+_WEBSITE_MAPPING = {
+    'github': 'https://github.com',
+    'google': 'https://google.com',
+    'news': 'https://news.ycombinator.com',
+    'hacker news': 'https://news.ycombinator.com',
+    'ycombinator': 'https://news.ycombinator.com',
+    'stackoverflow': 'https://stackoverflow.com',
+    'stack overflow': 'https://stackoverflow.com',
+    'example': 'https://example.com',
+    'amazon': 'https://amazon.com',
+    'flipkart': 'https://flipkart.com',
+    'youtube': 'https://youtube.com',
+    'reddit': 'https://reddit.com'
+}
+# One pass over the utterance; longest names first so "hacker news" beats "news"
+_WEBSITE_RE = re.compile(r'\b(' + '|'.join(
+    re.escape(name).replace(r'\ ', r'\s+')
+    for name in sorted(_WEBSITE_MAPPING, key=len, reverse=True)
+) + r')\b')
+
+# Search field in a browser_snapshot: any searchbox, or a textbox/combobox named like search
+_SEARCH_FIELD_RE = re.compile(
+    r'- (searchbox|(?:textbox|combobox)(?= "[^"\n]*search)) "([^"]*)"[^\n]*?\[ref=(\w+)\]',
+    re.IGNORECASE,
+)
+_SEARCH_QUERY_RE = re.compile(r'\b(?:search for|find|look for)\s+(.+)')
+
+
+@lru_cache(maxsize=4096)
 def extract_website_from_utterance(utterance: str) -> str:
     """Extract target website from voice command with smart parsing"""
     utterance_lower = utterance.lower()
     
-    # Direct URL patterns
-    url_patterns = [
-        r'(https?://[^\s]+)',
-        r'(www\.[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'(?:visit|go to|open|navigate to)\s+([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'(?:on|at)\s+([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'\b([a-zA-Z0-9.-]+\.(?:com|org|net|edu|gov|io|co)\b)'
-    ]
-    
-    for pattern in url_patterns:
-        match = re.search(pattern, utterance_lower)
+    for pattern in _URL_PATTERNS:
+        match = pattern.search(utterance_lower)
         if match:
             url = match.group(1)
             if not url.startswith('http'):
@@ -193,58 +256,58 @@ def extract_website_from_utterance(utterance: str) -> str:
             return url
     
     # Smart website mapping for common references
-    website_mapping = {
-        'github': 'https://github.com',
-        'google': 'https://google.com',
-        'news': 'https://news.ycombinator.com',
-        'hacker news': 'https://news.ycombinator.com',
-        'ycombinator': 'https://news.ycombinator.com',
-        'stackoverflow': 'https://stackoverflow.com',
-        'stack overflow': 'https://stackoverflow.com',
-        'example': 'https://example.com',
-        'amazon': 'https://amazon.com',
-        'flipkart': 'https://flipkart.com',
-        'youtube': 'https://youtube.com',
-        'reddit': 'https://reddit.com'
-    }
-    
-    for keyword, url in website_mapping.items():
-        if keyword in utterance_lower:
-            return url
+    match = _WEBSITE_RE.search(utterance_lower)
+    if match:
+        return _WEBSITE_MAPPING[" ".join(match.group(1).split())]
     
     # Default for demo
     return 'https://example.com'
 
 
+@lru_cache(maxsize=4096)
 def extract_action_from_utterance(utterance: str) -> str:
     """Extract intended action from voice command"""
-    utterance_lower = utterance.lower()
+    words = _WORD_RE.findall(utterance.lower())
     
-    if any(word in utterance_lower for word in ['search', 'find', 'look for']):
-        return "search"
-    elif any(word in utterance_lower for word in ['login', 'log in', 'sign in']):
-        return "login"
-    elif any(word in utterance_lower for word in ['click', 'press', 'tap']):
-        return "click"
-    elif any(word in utterance_lower for word in ['type', 'fill', 'enter']):
-        return "fill"
-    else:
-        return "navigate"
+    # Every word plus every adjacent pair, built once and checked per action by set lookup
+    terms = set(words)
+    terms.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    
+    for action, keywords in _ACTION_SETS:
+        if not keywords.isdisjoint(terms):
+            return action
+    return "navigate"
 
 
+@lru_cache(maxsize=4096)
 def extract_search_query(utterance: str) -> str:
     """Extract search query from voice command"""
-    patterns = [
-        r'search for (.+)',
-        r'find (.+)',
-        r'look for (.+)'
-    ]
+    match = _SEARCH_QUERY_RE.search(utterance.lower())
+    if match:
+        return match.group(1).strip()
     
-    for pattern in patterns:
-        match = re.search(pattern, utterance.lower())
-        if match:
-            return match.group(1).strip()
+    return None
+
+
+async def fill_first_present(client: RealMCPClient, selectors: list, text: str) -> str | None:
+    """Fill the first candidate field on the page; returns the selector that worked"""
+    # Usually one snapshot names the field, and one targeted fill does the job
+    selector = await client.first_present(selectors)
+    if selector:
+        fill_result = await client.playwright_fill(selector, text)
+        if fill_result.ok:
+            return selector
+        logger.debug(f"Selector {selector} failed: {fill_result.error}")
     
+    # No usable hint: try the candidates in order and stop at the first that works,
+    # since a form can match several of them (e.g. a login form's email and username)
+    for candidate in selectors:
+        if candidate == selector:
+            continue  # Already tried above
+        fill_result = await client.playwright_fill(candidate, text)
+        if fill_result.ok:
+            return candidate
+        logger.debug(f"Selector {candidate} failed: {fill_result.error}")
     return None
 
 
@@ -252,37 +315,28 @@ async def perform_real_search(client: RealMCPClient, search_query: str, results:
     """Perform actual search on real website"""
     logger.info(f"🔍 Performing REAL search for: {search_query}")
     
-    search_selectors = [
-        'input[type="search"]',
-        'input[name="q"]',
-        'input[name="search"]', 
-        'input[placeholder*="search" i]',
-        '#search',
-        '.search-input',
-        '[aria-label*="search" i]'
-    ]
+    # One snapshot locates the field by its aria ref; one browser_type fills and submits it
+    snapshot = await client.snapshot_text()
+    match = _SEARCH_FIELD_RE.search(snapshot or "")
+    if not match:
+        logger.debug("No search field in the page snapshot")
+        return
     
-    for selector in search_selectors:
-        try:
-            fill_result = await client.playwright_fill(selector, search_query)
-            if fill_result.ok:
-                results.append({
-                    "step": "real_search_fill",
-                    "success": True,
-                    "details": f"Filled real search field with: {search_query}"
-                })
-                
-                # Try to submit
-                submit_result = await client.playwright_key("Enter")
-                results.append({
-                    "step": "real_search_submit",
-                    "success": submit_result.ok,
-                    "details": "Submitted real search on actual website"
-                })
-                break
-        except Exception as e:
-            logger.debug(f"Search selector {selector} failed: {e}")
-            continue
+    role, name, ref = match.group(1), match.group(2), match.group(3)
+    type_result = await client.browser_type(ref, f'{role} "{name}"', search_query, submit=True)
+    if type_result.ok:
+        results.append({
+            "step": "real_search_fill",
+            "success": True,
+            "details": f"Filled real search field with: {search_query}"
+        })
+        results.append({
+            "step": "real_search_submit",
+            "success": True,
+            "details": "Submitted real search on actual website"
+        })
+    else:
+        logger.debug(f"Search field {ref} failed: {type_result.error}")
 
 
 async def perform_real_login(client: RealMCPClient, results: list):
@@ -300,19 +354,12 @@ async def perform_real_login(client: RealMCPClient, results: list):
         '[aria-label*="username" i]'
     ]
     
-    for selector in login_selectors:
-        try:
-            fill_result = await client.playwright_fill(selector, "demo@example.com")
-            if fill_result.ok:
-                results.append({
-                    "step": "real_login_interaction",
-                    "success": True,
-                    "details": f"Interacted with real login field on actual website"
-                })
-                break
-        except Exception as e:
-            logger.debug(f"Login selector {selector} failed: {e}")
-            continue
+    if await fill_first_present(client, login_selectors, "demo@example.com"):
+        results.append({
+            "step": "real_login_interaction",
+            "success": True,
+            "details": f"Interacted with real login field on actual website"
+        })
 
 
 if __name__ == "__main__":
@@ -322,4 +369,6 @@ if __name__ == "__main__":
     print("🎤 Voice Command: 'visit news.ycombinator.com'")
     print("🤖 Make sure 'AI Enhanced' is ON for real automation!")
     
+    # uvicorn's default "auto" loop already runs on uvloop when it is installed
+    # (it ships with uvicorn[standard])
     uvicorn.run(app, host="127.0.0.1", port=8081)
@@ -4,7 +4,7 @@ setup(
     name="heyq",
     version="0.1.0",
     description="Voice-Controlled Enterprise Test Automation Framework",
-    packages=find_packages(),
+    packages=find_packages(include=["heyq", "heyq.*"]),
     include_package_data=True,
     install_requires=[
         # Kept empty; use requirements.txt for pinned deps
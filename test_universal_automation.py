@@ -3,150 +3,210 @@
 Test the universal URL extraction and enhanced search term parsing
 """
 
-import re
+import os
+import sys
+from functools import lru_cache
+from typing import Final, Optional, cast
 from loguru import logger
 
+from heyq.regex import compile_pattern as _compile
+
+
+# Enhanced URL patterns for ANY website (not just hardcoded ones)
+# Pattern 1: Full URLs with protocol. Wins wherever it appears, so it is checked first.
+_FULL_URL_RE: Final = _compile(r'https?://[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,}(?:/[^\s]*)?')
+
+# Patterns 2 and 3 fused into one alternation, so a single left-to-right scan
+# finds candidates for both
+_DOMAIN_RE: Final = _compile(
+    # Pattern 2: Direct domain mentions (most common)
+    r'(?:visit|go to|open|navigate to)\s+(?P<verb>[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})'
+    # Pattern 3: Domains mentioned anywhere in command
+    r'|\b(?P<tld>[a-zA-Z0-9\-\.]+\.(?:com|org|net|edu|gov|io|co|in|uk|de|fr|au|ca|jp|cn|br|mx|es|it|ru))\b'
+)
+# Pattern priority: an earlier pattern wins wherever it matches in the command
+_URL_PATTERN_RANK: Final = {"verb": 2, "tld": 3}
+
+# Pattern 4: Handle "make my trip" -> "makemytrip.com" type conversions. Its lazy
+# phrase spans dots and would swallow later domains, so it only runs on its own,
+# once nothing else matched.
+_PHRASE_RE: Final = _compile(r'(?:go to|visit|open)\s+(.+?)(?:\s+and|\s*$)')
+
+# Common words that aren't domains
+_SKIP_WORDS: Final = frozenset({'and', 'search', 'find', 'look', 'for', 'me', 'my', 'the', 'a', 'an'})
+
+# Substrings that make a bare word look like a brand domain ("bookmyshow", "makemytrip")
+_DOMAIN_HINT_SUBSTRINGS: Final = ('my', 'book', 'shop', 'buy', 'get', 'make')
+_DOMAIN_HINT_RE: Final = _compile('|'.join(_DOMAIN_HINT_SUBSTRINGS))  # All hints in one scan
+
+# Whole-word cues for the search fallback ("research" is not a search command)
+_SEARCH_CUES: Final = frozenset({'search', 'find', 'look'})
+
+_CLEAN_TRAILING: Final = _compile(r'\s+(and|search|find).*$')
+
+# Search term patterns. Commands are lowercased on entry, so no pattern in this
+# module needs IGNORECASE.
+_SEARCH_FOR: Final = _compile(r'search for (.+)|find (.+)|look for (.+)')
+_SEARCH_ME: Final = _compile(r'search me (.+)')
+_AND_SEARCH: Final = _compile(r'(?:go to|open|visit)\s+[^\s]+(?:\.[a-z]{2,})?\s+and\s+search(?:\s+me)?\s+(.+)')
+_SEARCH_ANY: Final = _compile(r'search\s+(.+)')
+_STOP_SUFFIX: Final = _compile(r'\s+(on|in|at)\s+\w+\.\w+.*$')
+_TICKET_PREFIX: Final = _compile(r'^\s*ticket\s+for\s+')
+_FLIGHT_SUFFIX: Final = _compile(r'\s+flight\s*$')
+
+@lru_cache(maxsize=512)
 def extract_target_url(voice_command: str) -> str:
     """Extract target URL from voice command - UNIVERSAL approach for ANY website"""
     cmd = voice_command.lower()
     
-    print(f"🌐 UNIVERSAL URL EXTRACTION from: '{voice_command}'")
-    
-    # Enhanced URL patterns for ANY website (not just hardcoded ones)
-    url_patterns = [
-        # Pattern 1: Full URLs with protocol
-        r'(https?://[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,}(?:/[^\s]*)?)',
+    logger.debug("🌐 UNIVERSAL URL EXTRACTION from: '{}'", voice_command)
+    
+    extracted_url: Optional[str] = None
+    matched_pattern: Optional[int] = None
+    
+    # Patterns 1-3 all need a dot; without one only the phrase pattern can match
+    if '.' in cmd:
+        # Full URLs start at an "http", so only try the pattern where one occurs
+        http_idx = cmd.find('http')
+        while http_idx != -1:
+            match = _FULL_URL_RE.match(cmd, http_idx)
+            if match:
+                extracted_url = match.group()
+                matched_pattern = 1
+                break
+            http_idx = cmd.find('http', http_idx + 1)
         
-        # Pattern 2: Direct domain mentions (most common)
-        r'(?:visit|go to|open|navigate to)\s+([a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})',
-        
-        # Pattern 3: Domains mentioned anywhere in command
-        r'\b([a-zA-Z0-9\-\.]+\.(?:com|org|net|edu|gov|io|co|in|uk|de|fr|au|ca|jp|cn|br|mx|es|it|ru))\b',
-        
-        # Pattern 4: Handle "make my trip" -> "makemytrip.com" type conversions
-        r'(?:go to|visit|open)\s+(.+?)(?:\s+and|\s*$)',
-    ]
+        if not extracted_url:
+            # Every domain candidate is accepted, so the first from the higher-priority pattern wins
+            for match in _DOMAIN_RE.finditer(cmd):
+                group = cast(str, match.lastgroup)  # Every alternative is a named group
+                rank = _URL_PATTERN_RANK[group]
+                if matched_pattern is None or rank < matched_pattern:
+                    extracted_url = match.group(group)
+                    matched_pattern = rank
+                    if rank == 2:
+                        break
+    
+    if not extracted_url:
+        for match in _PHRASE_RE.finditer(cmd):
+            potential_url = match.group(1).strip()
+            
+            # Handle special cases like "make my trip" -> "makemytrip.com"
+            if ' ' in potential_url and not potential_url.startswith('http'):
+                # Convert "make my trip" to "makemytrip.com"
+                potential_url = potential_url.replace(' ', '').replace('-', '') + '.com'
+            
+            # Ensure it has a valid TLD. This also rejects the common words in
+            # _SKIP_WORDS: a lone word has neither a dot nor a space.
+            if '.' in potential_url or potential_url.startswith('http'):
+                extracted_url = potential_url
+                matched_pattern = 4
+                break
     
-    extracted_url = None
-    
-    for i, pattern in enumerate(url_patterns, 1):
-        matches = re.findall(pattern, cmd)
-        if matches:
-            # Take the first match that looks like a domain
-            for match in matches:
-                potential_url = match.strip()
-                
-                # Skip common words that aren't domains
-                skip_words = ['and', 'search', 'find', 'look', 'for', 'me', 'my', 'the', 'a', 'an']
-                if potential_url.lower() in skip_words:
-                    continue
-                
-                # Handle special cases like "make my trip" -> "makemytrip.com"
-                if ' ' in potential_url and not potential_url.startswith('http'):
-                    # Convert "make my trip" to "makemytrip.com"
-                    potential_url = potential_url.replace(' ', '').replace('-', '') + '.com'
-                
-                # Ensure it has a valid TLD
-                if '.' in potential_url or potential_url.startswith('http'):
-                    extracted_url = potential_url
-                    print(f"✅ Pattern {i} matched: '{extracted_url}'")
-                    break
-        
-        if extracted_url:
-            break
+    if extracted_url:
+        logger.debug("✅ Pattern {} matched: '{}'", matched_pattern, extracted_url)
     
     # Intelligent domain normalization
     if extracted_url:
         # Remove any trailing "and" or other words
-        extracted_url = re.sub(r'\s+(and|search|find).*$', '', extracted_url, flags=re.IGNORECASE).strip()
+        extracted_url = _CLEAN_TRAILING.sub('', extracted_url).strip()
         
         # Add protocol if missing
         if not extracted_url.startswith('http'):
             extracted_url = f"https://{extracted_url}"
         
-        print(f"🎯 FINAL EXTRACTED URL: '{extracted_url}'")
+        logger.debug("🎯 FINAL EXTRACTED URL: '{}'", extracted_url)
         return extracted_url
     
     # INTELLIGENT FALLBACK: Try to extract any meaningful domain-like words
     # Look for patterns like "makemytrip", "bookmyshow", etc.
     words = cmd.split()
-    for word in words:
-        # Skip common words
-        if word in ['go', 'to', 'and', 'search', 'find', 'look', 'for', 'me', 'my', 'the', 'a', 'an']:
-            continue
-        
-        # Look for compound words that could be domains
-        if len(word) > 3 and not word.isdigit():
-            # Common domain patterns
-            if any(pattern in word for pattern in ['my', 'book', 'shop', 'buy', 'get', 'make']):
-                potential_domain = f"https://{word}.com"
-                print(f"🔄 INTELLIGENT FALLBACK: '{word}' -> '{potential_domain}'")
-                return potential_domain
+    # Hints never span a space, so one scan of the whole command rules the loop out
+    if _DOMAIN_HINT_RE.search(cmd):
+        for word in words:
+            # Skip common words ("go" and "to" are too short to pass the length check below)
+            if word in _SKIP_WORDS:
+                continue
+            
+            # Look for compound words that could be domains
+            if len(word) > 3 and not word.isdigit():
+                # Common domain patterns
+                if _DOMAIN_HINT_RE.search(word):
+                    potential_domain = f"https://{word}.com"
+                    logger.debug("🔄 INTELLIGENT FALLBACK: '{}' -> '{}'", word, potential_domain)
+                    return potential_domain
     
     # LAST RESORT: Default to Google for search commands
-    if any(word in cmd for word in ['search', 'find', 'look']):
-        print("🔄 SEARCH FALLBACK: Defaulting to Google")
+    if not _SEARCH_CUES.isdisjoint(words):
+        logger.debug("🔄 SEARCH FALLBACK: Defaulting to Google")
         return "https://google.com"
     
     # Absolute fallback
-    print(f"⚠️ NO URL EXTRACTED from '{voice_command}', defaulting to Google")
+    logger.debug("⚠️ NO URL EXTRACTED from '{}', defaulting to Google", voice_command)
     return "https://google.com"
 
-def test_search_extraction(cmd):
-    """Test enhanced search term extraction"""
-    print(f"\n🔍 Testing search extraction: '{cmd}'")
+@lru_cache(maxsize=512)
+def extract_search_term(cmd: str) -> Optional[str]:
+    """Enhanced search term extraction; pure over the command, so results are cached"""
+    logger.debug("\n🔍 Testing search extraction: '{}'", cmd)
     cmd = cmd.lower()
     
     # Enhanced search term extraction for ANY type of search (flights, hotels, etc.)
-    search_term = None
-    
-    # Pattern 1: "search for X", "find X", "look for X"
-    query = re.search(r'search for (.+)|find (.+)|look for (.+)', cmd)
-    if query:
-        search_term = query.group(1) or query.group(2) or query.group(3)
-        print(f"   ✅ Pattern 1: '{search_term}'")
-    
-    # Pattern 2: "search me X" - common for travel/booking sites
-    if not search_term:
-        pattern = re.search(r'search me (.+)', cmd)
-        if pattern:
-            search_term = pattern.group(1).strip()
-            print(f"   ✅ Pattern 2: '{search_term}'")
-    
-    # Pattern 3: "go to X and search Y" or "open X and search Y"  
-    if not search_term:
-        pattern = re.search(r'(?:go to|open|visit)\s+[^\s]+(?:\.[a-z]{2,})?\s+and\s+search(?:\s+me)?\s+(.+)', cmd)
-        if pattern:
-            search_term = pattern.group(1).strip()
-            print(f"   ✅ Pattern 3: '{search_term}'")
-        else:
-            # Handle simple "search X" pattern
-            pattern = re.search(r'search\s+(.+)', cmd)
+    search_term: Optional[str] = None
+    
+    # Every pattern needs one of the search cues, so skip them all when none occurs
+    if any(cue in cmd for cue in _SEARCH_CUES):
+        # Pattern 1: "search for X", "find X", "look for X"
+        query = _SEARCH_FOR.search(cmd)
+        if query:
+            search_term = query.group(1) or query.group(2) or query.group(3)
+            logger.debug("   ✅ Pattern 1: '{}'", search_term)
+    
+        # Pattern 2: "search me X" - common for travel/booking sites
+        if not search_term:
+            pattern = _SEARCH_ME.search(cmd)
             if pattern:
                 search_term = pattern.group(1).strip()
-                print(f"   ✅ Pattern 3b: '{search_term}'")
+                logger.debug("   ✅ Pattern 2: '{}'", search_term)
+    
+        # Pattern 3: "go to X and search Y" or "open X and search Y"  
+        if not search_term:
+            pattern = _AND_SEARCH.search(cmd)
+            if pattern:
+                search_term = pattern.group(1).strip()
+                logger.debug("   ✅ Pattern 3: '{}'", search_term)
+            else:
+                # Handle simple "search X" pattern
+                pattern = _SEARCH_ANY.search(cmd)
+                if pattern:
+                    search_term = pattern.group(1).strip()
+                    logger.debug("   ✅ Pattern 3b: '{}'", search_term)
     
     # INTELLIGENT CLEANUP for travel/flight searches
     if search_term:
         original_term = search_term
         
         # Remove domain references that got mixed in
-        search_term = re.sub(r'\s+(on|in|at)\s+\w+\.\w+.*$', '', search_term, flags=re.IGNORECASE)
+        search_term = _STOP_SUFFIX.sub('', search_term)
         
         # Handle flight-specific patterns: "ticket for Delhi to Bangalore flight"
         # Clean up to: "Delhi to Bangalore flight"
-        search_term = re.sub(r'^\s*ticket\s+for\s+', '', search_term, flags=re.IGNORECASE)
-        search_term = re.sub(r'\s+flight\s*$', ' flight', search_term, flags=re.IGNORECASE)
+        search_term = _TICKET_PREFIX.sub('', search_term)
+        search_term = _FLIGHT_SUFFIX.sub(' flight', search_term)
         
         search_term = search_term.strip()
         
         if original_term != search_term:
-            print(f"   🧹 CLEANED: '{original_term}' -> '{search_term}'")
+            logger.debug("   🧹 CLEANED: '{}' -> '{}'", original_term, search_term)
     
-    print(f"   🎯 FINAL: '{search_term}'")
+    logger.debug("   🎯 FINAL: '{}'", search_term)
     return search_term
 
 if __name__ == "__main__":
+    # Parser traces go through loguru at DEBUG; LOGURU_LEVEL=INFO runs the cases quietly
+    logger.remove()
+    logger.add(sys.stdout, level=os.environ.get("LOGURU_LEVEL", "DEBUG"), format="{message}")
+    
     print("🧪 Testing Universal URL Extraction & Search Enhancement")
     print("=" * 70)
     
@@ -179,7 +239,7 @@ if __name__ == "__main__":
     
     print("\n🔍 SEARCH EXTRACTION TESTS:")
     for test_case in search_test_cases:
-        test_search_extraction(test_case)
+        extract_search_term(test_case)
     
     print("\n" + "=" * 70)
     print("✅ Universal automation - no more hardcoded website limitations!")
@@ -3,66 +3,109 @@
 Quick test script to validate voice command parsing logic
 """
 
-import re
+import os
+import sys
+from typing import Final, List, Optional
+from loguru import logger
 
-def test_search_parsing(cmd):
+from heyq.regex import compile_pattern as _compile
+
+
+# Search term patterns, compiled once at import. Commands are lowercased on entry,
+# so none of them need IGNORECASE.
+_SEARCH_FOR: Final = _compile(r'search for (.+)|find (.+)|look for (.+)')
+_AND_SEARCH: Final = _compile(r'(?:go to|open|visit)\s+[^\s]+\s+and\s+search\s+(.+)')
+_SEARCH_ANY: Final = _compile(r'search\s+(.+)')
+_STOP_SUFFIX: Final = _compile(r'\s+(on|in|at)\s+\w+\.\w+.*$')
+
+# Fallback cleanup works on whole tokens: "<nav verb> <site> [and]" and the search verbs go
+_NAV_VERBS: Final = frozenset({'open', 'visit'})
+_NAV_TWO_WORD_VERBS: Final = frozenset({'go', 'navigate'})  # Followed by "to"
+_SEARCH_VERBS: Final = frozenset({'search', 'find', 'look'})
+
+def test_search_parsing(cmd: str) -> str:
     """Test the enhanced search term extraction logic"""
-    print(f"\n🧪 Testing command: '{cmd}'")
+    logger.debug("\n🧪 Testing command: '{}'", cmd)
     cmd = cmd.lower()
     
     # Enhanced search term extraction with multiple patterns
-    search_term = None
+    search_term: Optional[str] = None
     
-    # Pattern 1: "search for X", "find X", "look for X"
-    query = re.search(r'search for (.+)|find (.+)|look for (.+)', cmd)
-    if query:
-        search_term = query.group(1) or query.group(2) or query.group(3)
-        print(f"   ✅ Pattern 1 matched: '{search_term}'")
+    # Every pattern needs one of the search verbs, so skip them all when none occurs
+    if any(verb in cmd for verb in _SEARCH_VERBS):
+        # Pattern 1: "search for X", "find X", "look for X"
+        query = _SEARCH_FOR.search(cmd)
+        if query:
+            search_term = query.group(1) or query.group(2) or query.group(3)
+            logger.debug("   ✅ Pattern 1 matched: '{}'", search_term)
     
-    # Pattern 2: "search X" (without "for"), "go to Y and search X"  
-    if not search_term:
-        # Handle "go to X and search Y" or "open X and search Y"
-        pattern = re.search(r'(?:go to|open|visit)\s+[^\s]+\s+and\s+search\s+(.+)', cmd)
-        if pattern:
-            search_term = pattern.group(1).strip()
-            print(f"   ✅ Pattern 2a matched: '{search_term}'")
-        else:
-            # Handle simple "search X" pattern
-            pattern = re.search(r'search\s+(.+)', cmd)
+        # Pattern 2: "search X" (without "for"), "go to Y and search X"  
+        if not search_term:
+            # Handle "go to X and search Y" or "open X and search Y"
+            pattern = _AND_SEARCH.search(cmd)
             if pattern:
                 search_term = pattern.group(1).strip()
-                print(f"   ✅ Pattern 2b matched: '{search_term}'")
+                logger.debug("   ✅ Pattern 2a matched: '{}'", search_term)
+            else:
+                # Handle simple "search X" pattern
+                pattern = _SEARCH_ANY.search(cmd)
+                if pattern:
+                    search_term = pattern.group(1).strip()
+                    logger.debug("   ✅ Pattern 2b matched: '{}'", search_term)
     
-    # Pattern 3: Extract everything after "find" or "look"
-    if not search_term:
-        if 'find ' in cmd:
-            search_term = cmd.split('find ', 1)[1].strip()
-            print(f"   ✅ Pattern 3a matched: '{search_term}'")
-        elif 'look ' in cmd:
-            search_term = cmd.split('look ', 1)[1].strip()
-            print(f"   ✅ Pattern 3b matched: '{search_term}'")
+        # Pattern 3: Extract everything after "find" or "look"
+        if not search_term:
+            if 'find ' in cmd:
+                search_term = cmd.split('find ', 1)[1].strip()
+                logger.debug("   ✅ Pattern 3a matched: '{}'", search_term)
+            elif 'look ' in cmd:
+                search_term = cmd.split('look ', 1)[1].strip()
+                logger.debug("   ✅ Pattern 3b matched: '{}'", search_term)
     
     # Clean up search term (remove common stop words at the end)
     if search_term:
         original = search_term
         # Remove trailing words like "on youtube", "in google", etc.
-        search_term = re.sub(r'\s+(on|in|at)\s+\w+\.\w+.*$', '', search_term, flags=re.IGNORECASE)
+        search_term = _STOP_SUFFIX.sub('', search_term)
         search_term = search_term.strip()
         if original != search_term:
-            print(f"   🧹 Cleaned: '{original}' -> '{search_term}'")
+            logger.debug("   🧹 Cleaned: '{}' -> '{}'", original, search_term)
     
     # Final fallback with better default
     if not search_term or len(search_term.strip()) == 0:
         # Try to extract any meaningful content after removing navigation words
-        cleaned_cmd = re.sub(r'(go to|open|visit|navigate to)\s+[^\s]+\s*(and\s*)?', '', cmd, flags=re.IGNORECASE)
-        cleaned_cmd = re.sub(r'\b(search|find|look)\s*', '', cleaned_cmd, flags=re.IGNORECASE).strip()
+        tokens = cmd.split()
+        kept: List[str] = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in _NAV_VERBS:
+                verb_len = 1
+            elif token in _NAV_TWO_WORD_VERBS and i + 1 < len(tokens) and tokens[i + 1] == 'to':
+                verb_len = 2
+            else:
+                verb_len = 0
+            
+            if verb_len and i + verb_len < len(tokens):
+                i += verb_len + 1  # The verb and the site it names
+                if i < len(tokens) and tokens[i] == 'and':
+                    i += 1
+                continue
+            if token not in _SEARCH_VERBS:
+                kept.append(token)
+            i += 1
+        cleaned_cmd = ' '.join(kept)
         search_term = cleaned_cmd if cleaned_cmd else "trending"
-        print(f"   🔄 Fallback applied: '{search_term}'")
+        logger.debug("   🔄 Fallback applied: '{}'", search_term)
     
-    print(f"   🎯 FINAL RESULT: '{search_term}'")
+    logger.debug("   🎯 FINAL RESULT: '{}'", search_term)
     return search_term
 
 if __name__ == "__main__":
+    # Parser traces go through loguru at DEBUG; LOGURU_LEVEL=INFO runs the cases quietly
+    logger.remove()
+    logger.add(sys.stdout, level=os.environ.get("LOGURU_LEVEL", "DEBUG"), format="{message}")
+    
     print("🧪 Testing Voice Command Parsing Logic")
     print("=" * 50)
     
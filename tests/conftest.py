@@ -0,0 +1,32 @@
+import pytest
+from playwright.sync_api import sync_playwright
+
+# Not needed to resolve locators, and the bulk of every product page's bytes.
+# Stylesheets still load: without CSS, to_be_visible() can't tell hidden
+# duplicates (mobile-only inputs, collapsed menus) from the real element.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+@pytest.fixture(scope="session")
+def browser():
+    # One Chromium for the whole session; cold launches dominate locator checks
+    with sync_playwright() as p:
+        b = p.chromium.launch(headless=True)
+        yield b
+        b.close()
+
+
+def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+@pytest.fixture
+def context(browser):
+    # Fresh cookies/storage per test on the shared browser
+    ctx = browser.new_context(viewport={"width": 1280, "height": 800})
+    ctx.route("**/*", _block_heavy_resources)
+    yield ctx
+    ctx.close()
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import sys
+
+from mcp_integration.real_mcp_client import RealMCPClient
+
+# Stand-in MCP server: answers each JSON-RPC request line from a per-method table.
+# Requests named in HOLD are answered only once the next request has arrived,
+# so their responses come back out of order.
+_FAKE_SERVER = r'''
+import json, sys
+with open(sys.argv[1]) as f:
+    ANSWERS = json.load(f)
+HOLD = set(sys.argv[2:])
+held = []
+for line in sys.stdin:
+    request = json.loads(line)
+    name = request["params"].get("name", request["method"])
+    response = {"jsonrpc": "2.0", "id": request["id"], "result": ANSWERS[name]}
+    if name in HOLD:
+        held.append(response)
+        continue
+    for out in [response] + held:
+        sys.stdout.write(json.dumps(out) + "\n")
+    held = []
+    sys.stdout.flush()
+'''
+
+
+async def _connect(client, tmp_path, answers, hold=()):
+    """Attach the client to a fake server the way start_mcp_server would"""
+    answers_file = tmp_path / "answers.json"
+    answers_file.write_text(json.dumps(answers))
+    client.process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", _FAKE_SERVER, str(answers_file), *hold,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        limit=2**20,
+    )
+    client._reader_task = asyncio.create_task(client._reader_loop())
+
+
+def _text(value):
+    return {"content": [{"type": "text", "text": value}]}
+
+
+def test_response_line_over_stream_limit(tmp_path):
+    async def run():
+        client = RealMCPClient()
+        big = "x" * (3 * 2**20 // 2)  # 1.5 MiB, past the 1 MiB stream limit
+        await _connect(client, tmp_path, {"big": _text(big), "small": _text("ok")})
+        try:
+            result = await client.send_mcp_request("tools/call", {"name": "big", "arguments": {}})
+            assert result.ok and result.data["content"][0]["text"] == big
+            # The reader survived the long line and still answers
+            result = await client.send_mcp_request("tools/call", {"name": "small", "arguments": {}})
+            assert result.ok and client.is_running()
+        finally:
+            await client.close()
+    asyncio.run(run())
+
+
+def test_out_of_order_responses_reach_their_requests(tmp_path):
+    async def run():
+        client = RealMCPClient()
+        await _connect(client, tmp_path, {"slow": _text("slow"), "fast": _text("fast")}, hold=["slow"])
+        try:
+            slow, fast = await asyncio.gather(
+                client.send_mcp_request("tools/call", {"name": "slow", "arguments": {}}),
+                client.send_mcp_request("tools/call", {"name": "fast", "arguments": {}}),
+            )
+            assert slow.data["content"][0]["text"] == "slow"
+            assert fast.data["content"][0]["text"] == "fast"
+        finally:
+            await client.close()
+    asyncio.run(run())
+
+
+def test_is_running_is_false_once_the_reader_exits(tmp_path):
+    async def run():
+        client = RealMCPClient()
+        await _connect(client, tmp_path, {})
+        client.process.stdin.close()  # Server sees EOF and exits, closing stdout
+        await client._reader_task
+        assert not client.is_running()
+        await client.close()
+    asyncio.run(run())
+
+
+def test_first_present_matches_text_fields_only(tmp_path):
+    snapshot = "\n".join([
+        '- heading "Search our catalogue" [level=1]',
+        '- link "Email support" [ref=e2]',
+        '- textbox "Username" [ref=e5]',
+    ])
+
+    async def run():
+        client = RealMCPClient()
+        await _connect(client, tmp_path, {"browser_snapshot": _text(snapshot)})
+        try:
+            # "search" and "email" only occur outside form fields
+            assert await client.first_present(['#search', 'input[type="email"]']) is None
+            assert await client.first_present(['#search', '#username']) == '#username'
+        finally:
+            await client.close()
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks
+
+import hybrid_voice_automation as hva
+
+
+@pytest.mark.parametrize("utterance, action", [
+    ("open github.com", "simple_navigation"),
+    ("open lookbook.com", "simple_navigation"),  # Keywords only count as whole words
+    ("go to github.com and search python projects", "search"),
+    ("visit amazon.in and look for laptops", "search"),
+    ("find hotels in goa", "search"),
+    ("login to github.com", "login"),
+    ("sign in on github.com", "login"),
+    ("buy iphone 15 on amazon.in", "purchase"),
+    ("add to cart laptop", "purchase"),
+    ("search for shoes and buy them", "search"),  # Search outranks purchase
+])
+def test_intent_table(utterance, action):
+    cmd = hva._normalize_command(utterance)
+    strategy = hva._analyze_command(cmd, hva.extract_target_url(utterance))
+    assert strategy["action"] == action
+
+
+def test_search_target_extraction():
+    cmd = hva._normalize_command("Go to  GitHub.com and search Python projects")
+    assert hva._analyze_command(cmd, "https://github.com")["target"] == "python projects"
+
+
+@pytest.fixture
+def fake_runs(monkeypatch):
+    """Replace the browser run with canned step results; returns the run log"""
+    runs = []
+    outcome = {"success": True}
+
+    async def execute_automation(self, voice_command, target_url, demo_mode=False, events=None):
+        runs.append(voice_command)
+        strategy = self.analyze_voice_command(voice_command, target_url)
+        return [{"step": "navigation", "success": True, "details": ""},
+                {"step": strategy["action"], "success": outcome["success"], "details": ""}], strategy
+
+    async def cleanup(self):
+        pass
+
+    monkeypatch.setattr(hva.HybridAutomationEngine, "execute_automation", execute_automation)
+    monkeypatch.setattr(hva.HybridAutomationEngine, "cleanup", cleanup)
+    hva._result_cache.clear()
+    yield runs, outcome
+    hva._result_cache.clear()
+
+
+def _run(utterance, **fields):
+    request = hva.VoiceRequest(utterance=utterance, **fields)
+    return asyncio.run(hva.hybrid_voice_automation(request, BackgroundTasks()))
+
+
+def test_repeated_command_is_served_from_cache(fake_runs):
+    runs, _ = fake_runs
+    first = _run("search for python on github.com")
+    # Same command up to case and spacing
+    assert _run("Search for  Python on github.com") == first
+    assert runs == ["search for python on github.com"]
+
+
+def test_failed_steps_are_not_cached(fake_runs):
+    runs, outcome = fake_runs
+    outcome["success"] = False
+    _run("search for python on github.com")
+    _run("search for python on github.com")
+    assert len(runs) == 2
+
+
+@pytest.mark.parametrize("utterance", ["login to github.com", "buy iphone on amazon.in"])
+def test_side_effect_flows_are_not_cached(fake_runs, utterance):
+    runs, _ = fake_runs
+    _run(utterance)
+    _run(utterance)
+    assert len(runs) == 2
+
+
+def test_streams_and_demos_bypass_cache(fake_runs):
+    runs, _ = fake_runs
+    _run("open github.com")
+    _run("open github.com", demo_mode=True)
+    assert len(runs) == 2